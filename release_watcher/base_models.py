@@ -36,6 +36,7 @@ class WatcherConfig(metaclass=ABCMeta):
 
     watcher_type_name: str = None
     name: str = None
+    interval: int = None
 
     def __init__(self, watcher_type_name: str, name: str):
         self.watcher_type_name = watcher_type_name
@@ -0,0 +1,148 @@
+import logging
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any
+from release_watcher.config_models import CoreConfig
+
+logger = logging.getLogger(__name__)
+
+CACHES = {}
+CACHE_DIR: str = None
+
+_CACHES_LOCK = threading.Lock()
+
+
+class PersistentLruCache:
+    """A size bounded cache, evicting the least recently used entries first
+
+    If a cache directory is configured, the content is loaded from and saved
+    to a JSON file in this directory, so that it survives restarts.
+    Values must therefore be JSON serializable."""
+
+    name: str = None
+    path: str = None
+    max_entries: int = None
+
+    def __init__(self, name: str, max_entries: int, path: str = None):
+        self.name = name
+        self.max_entries = max_entries
+        self.path = path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Returns the value stored for the key, and marks it as recently used"""
+
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+    def put(self, key: str, value: Any):
+        """Stores a value, evicting the least recently used entries if needed"""
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def remove(self, key: str):
+        """Removes an entry, if present"""
+
+        with self._lock:
+            if self._entries.pop(key, None) is not None:
+                self._dirty = True
+
+    def load(self):
+        """Loads the entries from the cache file, if any"""
+
+        if not self.path or not os.path.exists(self.path):
+            return
+
+        try:
+            with open(self.path, 'r', encoding='UTF-8') as cache_file:
+                entries = json.load(cache_file)
+        except (OSError, ValueError) as e:
+            logger.warning('Error loading cache %s from %s, ignoring it : %s',
+                           self.name, self.path, e)
+            return
+
+        with self._lock:
+            self._entries = OrderedDict(entries)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+        logger.debug('Loaded %d entries in cache %s', len(self._entries), self.name)
+
+    def save(self):
+        """Saves the entries to the cache file, if they changed since the last save"""
+
+        if not self.path:
+            return
+
+        with self._lock:
+            if not self._dirty:
+                return
+            entries = list(self._entries.items())
+            self._dirty = False
+
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w', encoding='UTF-8') as cache_file:
+            json.dump(entries, cache_file)
+        os.replace(tmp_path, self.path)
+
+        logger.debug('Saved %d entries of cache %s', len(entries), self.name)
+
+    def __repr__(self):
+        return f'PersistentLruCache({self.name}, {self.max_entries})'
+
+
+def init_caches(core_config: CoreConfig):
+    """Configures the directory where caches are persisted"""
+
+    global CACHE_DIR  # pylint: disable=global-statement
+
+    CACHE_DIR = core_config.cache_dir
+    if CACHE_DIR:
+        logger.info('Persisting caches in %s', CACHE_DIR)
+        os.makedirs(CACHE_DIR, exist_ok=True)
+
+
+def get_cache(name: str, max_entries: int) -> PersistentLruCache:
+    """Fetches a cache by name, creating and loading it on first use"""
+
+    with _CACHES_LOCK:
+        if name not in CACHES:
+            path = os.path.join(CACHE_DIR, f'{name}.json') if CACHE_DIR else None
+            cache = PersistentLruCache(name, max_entries, path)
+            cache.load()
+            CACHES[name] = cache
+
+        return CACHES[name]
+
+
+def save_caches():
+    """Saves all the caches that have been used"""
+
+    with _CACHES_LOCK:
+        caches = list(CACHES.values())
+
+    for cache in caches:
+        try:
+            cache.save()
+        except OSError as e:
+            logger.exception('Error saving cache %s : %s', cache.name, e)
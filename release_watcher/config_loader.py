@@ -1,13 +1,13 @@
 import logging
 from pathlib import Path
 from os import path
-from typing import Dict, Sequence
+from typing import Dict, Sequence, Tuple
 from yaml import load
 from release_watcher.sources import source_manager
 from release_watcher.outputs import output_manager
 from release_watcher.config_models import \
     ConfigException, GlobalConfig, LoggerConfig, CommonConfig, CoreConfig, \
-    GithubConfig, DockerConfig, PypiConfig, RawHtmlConfig
+    GithubConfig, DockerConfig, PypiConfig, RawHtmlConfig, HostLimitsConfig
 
 try:
     from yaml import CLoader as Loader  # pylint: disable=ungrouped-imports
@@ -90,7 +90,8 @@ def _parse_conf(conf: Dict) -> GlobalConfig:
 def _parse_core_conf(conf: Dict) -> CoreConfig:
     logger.debug('Loading core configuration')
 
-    default_conf = {'threads': 2, 'runMode': 'once', 'sleepDuration': 5}
+    default_conf = {'threads': 2, 'runMode': 'once', 'sleepDuration': 5,
+                    'poolConnections': 10, 'poolSize': 10}
 
     core_conf = conf.get('core', default_conf)
     threads = core_conf.get('threads', default_conf['threads'])
@@ -106,8 +107,9 @@ def _parse_core_conf(conf: Dict) -> CoreConfig:
     if run_mode == 'repeat':
         sleep_duration = core_conf.get('sleepDuration',
                                        default_conf['sleepDuration'])
-        if not isinstance(sleep_duration, int):
-            logger.warning('sleepDuration %s is not a number, falling back to %d',
+        if isinstance(sleep_duration, bool) or not isinstance(sleep_duration, int) \
+                or sleep_duration <= 0:
+            logger.warning('sleepDuration %s is not a positive number, falling back to %d',
                            sleep_duration, default_conf['sleepDuration'])
             sleep_duration = default_conf['sleepDuration']
     elif run_mode != 'once':
@@ -115,8 +117,32 @@ def _parse_core_conf(conf: Dict) -> CoreConfig:
                        run_mode, default_conf['runMode'])
         run_mode = default_conf['runMode']
 
+    pool_connections = core_conf.get('poolConnections', default_conf['poolConnections'])
+    if not isinstance(pool_connections, int):
+        logger.warning('poolConnections %s is not a number, falling back to %d',
+                       pool_connections, default_conf['poolConnections'])
+        pool_connections = default_conf['poolConnections']
+
+    pool_size = core_conf.get('poolSize', default_conf['poolSize'])
+    if not isinstance(pool_size, int):
+        logger.warning('poolSize %s is not a number, falling back to %d',
+                       pool_size, default_conf['poolSize'])
+        pool_size = default_conf['poolSize']
+
+    cache_dir = core_conf.get('cacheDir')
+    if cache_dir and not cache_dir.startswith('/'):
+        cache_dir = f'{conf["configFileDir"]}/{cache_dir}'
+
+    state_file = core_conf.get('stateFile')
+    if state_file and not state_file.startswith('/'):
+        state_file = f'{conf["configFileDir"]}/{state_file}'
+
     core_config = CoreConfig(threads, run_mode)
     core_config.sleep_duration = sleep_duration
+    core_config.pool_connections = pool_connections
+    core_config.pool_size = pool_size
+    core_config.cache_dir = cache_dir
+    core_config.state_file = state_file
     return core_config
 
 
@@ -126,14 +152,18 @@ def _parse_github_conf(conf: Dict) -> GithubConfig:
     default_conf = {
         'timeout': 10,
         'rate_limit_wait_max': 120,
+        'rate_limit_reserve': 100,
+        'api': 'rest',
+        'graphql_batch_size': 50,
+        'cache_size': 10000,
+        'probe': False,
     }
 
     common_conf = conf.get('common', {'github': default_conf})
     github_conf = common_conf.get('github', default_conf)
     github_config = GithubConfig()
 
-    github_config.username = github_conf.get('username')
-    github_config.password = github_conf.get('password')
+    github_config.credentials = _parse_github_credentials_conf(github_conf)
 
     timeout = github_conf.get('timeout', default_conf['timeout'])
     if not isinstance(timeout, (int, float)):
@@ -150,14 +180,74 @@ def _parse_github_conf(conf: Dict) -> GithubConfig:
         rate_limit_wait_max = default_conf['rate_limit_wait_max']
     github_config.rate_limit_wait_max = rate_limit_wait_max
 
+    rate_limit_reserve = github_conf.get('rate_limit_reserve', default_conf['rate_limit_reserve'])
+    if not isinstance(rate_limit_reserve, int) or rate_limit_reserve < 0:
+        logger.warning('rate_limit_reserve %s is not a positive number, falling back to %d',
+                       rate_limit_reserve, default_conf['rate_limit_reserve'])
+        rate_limit_reserve = default_conf['rate_limit_reserve']
+    github_config.rate_limit_reserve = rate_limit_reserve
+
+    api = github_conf.get('api', default_conf['api'])
+    if api not in ['rest', 'graphql']:
+        logger.warning('api %s is unknown, falling back to %s', api, default_conf['api'])
+        api = default_conf['api']
+    github_config.api = api
+
+    graphql_batch_size = github_conf.get('graphql_batch_size', default_conf['graphql_batch_size'])
+    if not isinstance(graphql_batch_size, int) or graphql_batch_size < 1:
+        logger.warning('graphql_batch_size %s is not a positive number, falling back to %d',
+                       graphql_batch_size, default_conf['graphql_batch_size'])
+        graphql_batch_size = default_conf['graphql_batch_size']
+    github_config.graphql_batch_size = graphql_batch_size
+
+    cache_size = github_conf.get('cache_size', default_conf['cache_size'])
+    if not isinstance(cache_size, int):
+        logger.warning('cache_size %s is not a number, falling back to %d',
+                       cache_size, default_conf['cache_size'])
+        cache_size = default_conf['cache_size']
+    github_config.cache_size = cache_size
+
+    probe = github_conf.get('probe', default_conf['probe'])
+    if not isinstance(probe, bool):
+        logger.warning('probe %s is not a boolean, falling back to %s',
+                       probe, default_conf['probe'])
+        probe = default_conf['probe']
+    github_config.probe = probe
+
+    github_config.host_limits = _parse_host_limits_conf(github_conf)
+    github_config.interval = _parse_interval_conf(github_conf)
+
     return github_config
 
 
+def _parse_github_credentials_conf(github_conf: Dict) -> Sequence[Tuple[str, str]]:
+    credentials = []
+    if github_conf.get('username'):
+        credentials.append((github_conf['username'], github_conf.get('password')))
+
+    credentials_conf = github_conf.get('credentials', [])
+    if not isinstance(credentials_conf, list):
+        logger.warning('credentials %s is not a list, ignoring it', credentials_conf)
+        credentials_conf = []
+
+    for credential_conf in credentials_conf:
+        if not isinstance(credential_conf, dict) or not credential_conf.get('username'):
+            logger.warning('credentials entry without a username, ignoring it')
+            continue
+        credentials.append((credential_conf['username'], credential_conf.get('password')))
+
+    return credentials
+
+
 def _parse_docker_conf(conf: Dict) -> DockerConfig:
     logger.debug('Loading docker configuration')
 
     default_conf = {
         'timeout': 10,
+        'cache_size': 10000,
+        'page_size': 1000,
+        'date_concurrency': 4,
+        'hub_api': True,
     }
 
     common_conf = conf.get('common', {'docker': default_conf})
@@ -171,6 +261,37 @@ def _parse_docker_conf(conf: Dict) -> DockerConfig:
         timeout = default_conf['timeout']
     docker_config.timeout = timeout
 
+    cache_size = docker_conf.get('cache_size', default_conf['cache_size'])
+    if not isinstance(cache_size, int):
+        logger.warning('cache_size %s is not a number, falling back to %d',
+                       cache_size, default_conf['cache_size'])
+        cache_size = default_conf['cache_size']
+    docker_config.cache_size = cache_size
+
+    page_size = docker_conf.get('page_size', default_conf['page_size'])
+    if not isinstance(page_size, int) or page_size <= 0:
+        logger.warning('page_size %s is not a positive number, falling back to %d',
+                       page_size, default_conf['page_size'])
+        page_size = default_conf['page_size']
+    docker_config.page_size = page_size
+
+    date_concurrency = docker_conf.get('date_concurrency', default_conf['date_concurrency'])
+    if not isinstance(date_concurrency, int) or date_concurrency <= 0:
+        logger.warning('date_concurrency %s is not a positive number, falling back to %d',
+                       date_concurrency, default_conf['date_concurrency'])
+        date_concurrency = default_conf['date_concurrency']
+    docker_config.date_concurrency = date_concurrency
+    docker_config.platform = docker_conf.get('platform')
+
+    hub_api = docker_conf.get('hub_api', default_conf['hub_api'])
+    if not isinstance(hub_api, bool):
+        logger.warning('hub_api %s is not a boolean, falling back to %s',
+                       hub_api, default_conf['hub_api'])
+        hub_api = default_conf['hub_api']
+    docker_config.hub_api = hub_api
+    docker_config.host_limits = _parse_host_limits_conf(docker_conf)
+    docker_config.interval = _parse_interval_conf(docker_conf)
+
     return docker_config
 
 
@@ -179,6 +300,8 @@ def _parse_pypi_conf(conf: Dict) -> PypiConfig:
 
     default_conf = {
         'timeout': 10,
+        'backend': 'json',
+        'changelog': False,
     }
 
     common_conf = conf.get('common', {'pypi': default_conf})
@@ -192,6 +315,22 @@ def _parse_pypi_conf(conf: Dict) -> PypiConfig:
         timeout = default_conf['timeout']
     pypi_config.timeout = timeout
 
+    backend = pypi_conf.get('backend', default_conf['backend'])
+    if backend not in ['json', 'simple']:
+        logger.warning('backend %s is not supported, falling back to %s',
+                       backend, default_conf['backend'])
+        backend = default_conf['backend']
+    pypi_config.backend = backend
+
+    changelog = pypi_conf.get('changelog', default_conf['changelog'])
+    if not isinstance(changelog, bool):
+        logger.warning('changelog %s is not a boolean, falling back to %s',
+                       changelog, default_conf['changelog'])
+        changelog = default_conf['changelog']
+    pypi_config.changelog = changelog
+    pypi_config.host_limits = _parse_host_limits_conf(pypi_conf)
+    pypi_config.interval = _parse_interval_conf(pypi_conf)
+
     return pypi_config
 
 
@@ -212,10 +351,37 @@ def _parse_raw_html_conf(conf: Dict) -> PypiConfig:
                        timeout, default_conf['timeout'])
         timeout = default_conf['timeout']
     raw_html_config.timeout = timeout
+    raw_html_config.host_limits = _parse_host_limits_conf(raw_html_conf)
+    raw_html_config.interval = _parse_interval_conf(raw_html_conf)
 
     return raw_html_config
 
 
+def _parse_interval_conf(service_conf: Dict) -> int:
+    interval = service_conf.get('interval')
+    if interval is not None and (isinstance(interval, bool) or not isinstance(interval, int)
+                                 or interval <= 0):
+        logger.warning('interval %s is not a positive number, ignoring it', interval)
+        interval = None
+
+    return interval
+
+
+def _parse_host_limits_conf(service_conf: Dict) -> HostLimitsConfig:
+    max_concurrency = service_conf.get('max_concurrency')
+    if max_concurrency is not None and not isinstance(max_concurrency, int):
+        logger.warning('max_concurrency %s is not a number, ignoring it', max_concurrency)
+        max_concurrency = None
+
+    requests_per_second = service_conf.get('requests_per_second')
+    if requests_per_second is not None and not isinstance(requests_per_second, (int, float)):
+        logger.warning('requests_per_second %s is not a number, ignoring it',
+                       requests_per_second)
+        requests_per_second = None
+
+    return HostLimitsConfig(max_concurrency, requests_per_second)
+
+
 def _parse_sources_conf(conf: Dict) -> Sequence[source_manager.SourceConfig]:
     logger.debug('Loading sources configuration')
     sources_conf = []
@@ -1,4 +1,4 @@
-from typing import Sequence
+from typing import Sequence, Tuple
 from release_watcher.base_models import SourceConfig, OutputConfig
 
 
@@ -29,6 +29,10 @@ class CoreConfig:
     threads: int = None
     run_mode: str = None
     sleep_duration: int = None
+    pool_connections: int = None
+    pool_size: int = None
+    cache_dir: str = None
+    state_file: str = None
 
     def __init__(self, threads: int, run_mode: str,
                  sleep_duration: int = None):
@@ -37,31 +41,65 @@ class CoreConfig:
         self.sleep_duration = sleep_duration
 
 
+class HostLimitsConfig:
+    """Model representing the limits applied to the requests sent to a host"""
+
+    max_concurrency: int = None
+    requests_per_second: float = None
+
+    def __init__(self, max_concurrency: int = None, requests_per_second: float = None):
+        self.max_concurrency = max_concurrency
+        self.requests_per_second = requests_per_second
+
+    def is_limited(self) -> bool:
+        """Returns True if at least one limit is set"""
+        return bool(self.max_concurrency or self.requests_per_second)
+
+
 class GithubConfig:
     """Model representing the github configuration"""
 
-    username: str = None
-    password: str = None
+    credentials: Sequence[Tuple[str, str]] = None
     timeout: float = None
+    host_limits: HostLimitsConfig = None
+    interval: int = None
     rate_limit_wait_max: int = None
+    rate_limit_reserve: int = None
+    api: str = None
+    graphql_batch_size: int = None
+    cache_size: int = None
+    probe: bool = None
 
 
 class DockerConfig:
     """Model representing the docker configuration"""
 
     timeout: float = None
+    host_limits: HostLimitsConfig = None
+    interval: int = None
+    cache_size: int = None
+    page_size: int = None
+    date_concurrency: int = None
+    platform: str = None
+    hub_api: bool = None
 
 
 class PypiConfig:
     """Model representing the pypi configuration"""
 
     timeout: float = None
+    host_limits: HostLimitsConfig = None
+    interval: int = None
+    backend: str = None
+    changelog: bool = None
 
 
 class RawHtmlConfig:
     """Model representing the raw_html configuration"""
 
     timeout: float = None
+    host_limits: HostLimitsConfig = None
+    interval: int = None
 
 
 class CommonConfig:
@@ -0,0 +1,85 @@
+import logging
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from release_watcher import request_scheduler
+from release_watcher.config_models import CoreConfig, HostLimitsConfig
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_SIZE = 10
+
+_SESSION: requests.Session = None
+_SESSION_LOCK = threading.Lock()
+
+
+def init_http_client(core_config: CoreConfig):
+    """Creates the HTTP session shared by all the watchers
+
+    Connections are kept alive in a pool per host, so that consecutive
+    calls to the same host reuse the same TCP and TLS connection."""
+
+    global _SESSION  # pylint: disable=global-statement
+
+    logger.info('Creating HTTP session with %d host pools of %d connections',
+                core_config.pool_connections, core_config.pool_size)
+
+    session = _create_session(core_config.pool_connections, core_config.pool_size)
+    with _SESSION_LOCK:
+        if _SESSION:
+            _SESSION.close()
+        _SESSION = session
+
+
+def get_session() -> requests.Session:
+    """Returns the shared HTTP session, creating a default one if needed"""
+
+    global _SESSION  # pylint: disable=global-statement
+
+    with _SESSION_LOCK:
+        if not _SESSION:
+            _SESSION = _create_session(DEFAULT_POOL_CONNECTIONS, DEFAULT_POOL_SIZE)
+        return _SESSION
+
+
+def get(url: str, host_limits: HostLimitsConfig = None, **kwargs) -> requests.Response:
+    """Sends a GET request using the shared HTTP session
+
+    The request waits until it fits in the limits of the target host"""
+
+    return _send('GET', url, host_limits, **kwargs)
+
+
+def head(url: str, host_limits: HostLimitsConfig = None, **kwargs) -> requests.Response:
+    """Sends a HEAD request using the shared HTTP session
+
+    The request waits until it fits in the limits of the target host"""
+
+    return _send('HEAD', url, host_limits, **kwargs)
+
+
+def post(url: str, host_limits: HostLimitsConfig = None, **kwargs) -> requests.Response:
+    """Sends a POST request using the shared HTTP session
+
+    The request waits until it fits in the limits of the target host"""
+
+    return _send('POST', url, host_limits, **kwargs)
+
+
+def _send(method: str, url: str, host_limits: HostLimitsConfig, **kwargs) -> requests.Response:
+    limiter = request_scheduler.get_limiter(url, host_limits)
+
+    if not limiter:
+        return get_session().request(method, url, **kwargs)
+
+    with limiter:
+        return get_session().request(method, url, **kwargs)
+
+
+def _create_session(pool_connections: int, pool_size: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
@@ -0,0 +1,55 @@
+import logging
+from typing import Dict, Tuple
+import requests
+from release_watcher import cache_manager
+
+logger = logging.getLogger(__name__)
+
+VALIDATORS_CACHE_NAME = 'http_validators'
+VALIDATORS_CACHE_SIZE = 10000
+
+
+def add_validator_headers(url: str, headers: Dict, auth: Tuple = None) -> Dict:
+    """Returns a copy of the headers, with the validators of the previous
+    response of the URL, if any
+
+    The server then answers with a 304 Not Modified if the content is still
+    the same, without sending it again."""
+
+    validators = _get_cache().get(_get_key(url, auth))
+    headers = dict(headers or {})
+
+    if validators:
+        if validators.get('etag'):
+            headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            headers['If-Modified-Since'] = validators['last_modified']
+
+    return headers
+
+
+def store_validators(url: str, response: requests.Response, auth: Tuple = None):
+    """Stores the validators (ETag and Last-Modified) of a response"""
+
+    etag = response.headers.get('ETag')
+    last_modified = response.headers.get('Last-Modified')
+
+    if etag or last_modified:
+        _get_cache().put(_get_key(url, auth), {'etag': etag, 'last_modified': last_modified})
+
+
+def forget_validators(url: str, auth: Tuple = None):
+    """Removes the validators of an URL, so that it's fully fetched next time"""
+
+    _get_cache().remove(_get_key(url, auth))
+
+
+def _get_key(url: str, auth: Tuple) -> str:
+    # The content may depend on the user, as well as the validators
+    if auth:
+        return f'{auth[0]}@{url}'
+    return url
+
+
+def _get_cache() -> cache_manager.PersistentLruCache:
+    return cache_manager.get_cache(VALIDATORS_CACHE_NAME, VALIDATORS_CACHE_SIZE)
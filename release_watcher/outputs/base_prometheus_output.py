@@ -4,7 +4,7 @@ from datetime import datetime, timezone
 from typing import Sequence
 from prometheus_client import CollectorRegistry, Gauge
 from release_watcher.outputs.output_manager import Output, OutputConfig
-from release_watcher.watchers import watcher_models
+from release_watcher.watchers import github_rate_limit, watcher_models
 
 logger = logging.getLogger(__name__)
 
@@ -16,12 +16,24 @@ class BasePrometheusOutput(Output, metaclass=ABCMeta):
     registry: CollectorRegistry = None
     new_releases_gauge: Gauge = None
     release_age_gauge: Gauge = None
+    github_rate_limit_gauge: Gauge = None
 
     def __init__(self, config: OutputConfig):
         super().__init__(config)
         self.registry = CollectorRegistry()
 
+    def add_result(self, result: watcher_models.WatchResult):
+        self._output_metrics([result])
+
     def _output_metrics(self, results: Sequence[watcher_models.WatchResult]):
+        self._init_gauges()
+
+        for result in results:
+            self._output_result_metrics(result)
+
+        self._output_rate_limit_metrics()
+
+    def _init_gauges(self):
         if not self.new_releases_gauge:
             logger.debug('Initializing new_releases_gauge')
             label_names = ['name', 'type']
@@ -38,25 +50,37 @@ class BasePrometheusOutput(Output, metaclass=ABCMeta):
                 'Age of the current release',
                 label_names, registry=self.registry)
 
-        for result in results:
-            label_values = [
-                str(result.config.name),
-                result.config.watcher_type_name
-            ]
-            self.new_releases_gauge.labels(*label_values).set(
-                len(result.missed_releases))
-
-            # This most probably won't take into account timezones
-            # But it will most probably be used as converted as days,
-            # so a few hours shouldn't matter
-            if result.current_release:
-                release_date = result.current_release.release_date
-                if release_date.tzinfo:
-                    now = datetime.now(timezone.utc)
-                else:
-                    now = datetime.now()
-                release_age = (now - release_date).total_seconds()
+        if not self.github_rate_limit_gauge:
+            logger.debug('Initializing github_rate_limit_gauge')
+            label_names = ['username', 'resource']
+            self.github_rate_limit_gauge = Gauge(
+                f'{self.metrics_namespace}_github_rate_limit_remaining',
+                'Number of GitHub API requests left before the rate limit resets',
+                label_names, registry=self.registry)
+
+    def _output_result_metrics(self, result: watcher_models.WatchResult):
+        label_values = [
+            str(result.config.name),
+            result.config.watcher_type_name
+        ]
+        self.new_releases_gauge.labels(*label_values).set(
+            result.get_missed_release_count())
+
+        # This most probably won't take into account timezones
+        # But it will most probably be used as converted as days,
+        # so a few hours shouldn't matter
+        if result.current_release:
+            release_date = result.current_release.release_date
+            if release_date.tzinfo:
+                now = datetime.now(timezone.utc)
             else:
-                release_age = float('inf')
+                now = datetime.now()
+            release_age = (now - release_date).total_seconds()
+        else:
+            release_age = float('inf')
+
+        self.release_age_gauge.labels(*label_values).set(release_age)
 
-            self.release_age_gauge.labels(*label_values).set(release_age)
+    def _output_rate_limit_metrics(self):
+        for (username, resource), budget in github_rate_limit.get_budgets().items():
+            self.github_rate_limit_gauge.labels(username or '', resource).set(budget.remaining)
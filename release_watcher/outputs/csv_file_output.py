@@ -53,7 +53,7 @@ class CsvFileOutput(Output):
 
             for result in results:
                 if not self.config.display_up_to_date and \
-                        not result.missed_releases:
+                        not result.get_missed_release_count():
                     continue
                 row = self._prepare_one_csv_row(result)
                 csv_writer.writerow(row)
@@ -76,7 +76,7 @@ class CsvFileOutput(Output):
         return [
             result.config.watcher_type_name, result.config.name, current_r,
             current_r_date,
-            len(result.missed_releases), most_recent_r_name, most_recent_r_date
+            result.get_missed_release_count(), most_recent_r_name, most_recent_r_date
         ]
 
 
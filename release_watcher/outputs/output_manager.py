@@ -21,6 +21,17 @@ class Output(metaclass=ABCMeta):
     def outputs(self, results: Sequence[watcher_models.WatchResult]):
         """Writes the results to the output"""
 
+    def add_result(self, result: watcher_models.WatchResult):
+        """Receives a single result, as soon as its watcher is finished
+
+        Outputs that can be updated incrementally should override this method.
+        By default, nothing is done until flush is called."""
+
+    def flush(self, results: Sequence[watcher_models.WatchResult]):
+        """Writes all the results once the watchers are finished"""
+
+        self.outputs(results)
+
     def __repr__(self):
         return f'{self.__class__.__name__}({self.config})'
 
@@ -36,14 +36,19 @@ class PrometheusHttpOutput(BasePrometheusOutput):
 
     def outputs(self, results: Sequence[watcher_models.WatchResult]):
         logger.debug('Exposing results on %d', self.config.port)
+        self._start_server()
+        self._output_metrics(results)
+
+    def add_result(self, result: watcher_models.WatchResult):
+        self._start_server()
+        super().add_result(result)
 
+    def _start_server(self):
         if not self.server_started:
             logger.info('Starting Prometheus HTTP Server on port %d', self.config.port)
             start_http_server(self.config.port, '0.0.0.0', self.registry)
             self.server_started = True
 
-        self._output_metrics(results)
-
 
 class PrometheusHttpOutputType(OutputType):
     """Class to represent the PrometheusHttpOutput type of Output"""
@@ -38,7 +38,7 @@ class YamlFileOutput(Output):
 
         yaml_dict = {'results': []}
         for result in results:
-            if not self.config.display_up_to_date and not result.missed_releases:
+            if not self.config.display_up_to_date and not result.get_missed_release_count():
                 continue
 
             result_dict = {}
@@ -48,7 +48,7 @@ class YamlFileOutput(Output):
                 result_dict['currentRelease'] = result.current_release.name
                 result_dict['currentReleaseDate'] = result.current_release.release_date
 
-            result_dict['missedReleaseCount'] = len(result.missed_releases)
+            result_dict['missedReleaseCount'] = result.get_missed_release_count()
             result_dict['missedReleases'] = []
 
             for missed_release in result.missed_releases:
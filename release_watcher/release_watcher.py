@@ -1,13 +1,15 @@
 from typing import Sequence
 import logging
+import queue
 import sys
-import time
 import click
-from release_watcher import config_loader
+from release_watcher import cache_manager, config_loader, http_client, state_store
 from release_watcher.config_models import GlobalConfig
 from release_watcher.watcher_runner import WatcherRunner
+from release_watcher.watcher_scheduler import WatcherScheduler
 from release_watcher.sources import source_manager
 from release_watcher.watchers import watcher_manager
+from release_watcher.watchers.watcher_models import WatchResult
 from release_watcher.outputs import output_manager
 logger = logging.getLogger(__name__)
 
@@ -18,12 +20,17 @@ def main(config: str):
     """Entrypoint for the Release Watch application"""
 
     global_config = config_loader.load_conf(config)
+    http_client.init_http_client(global_config.core)
+    cache_manager.init_caches(global_config.core)
     watchers = _create_watchers(global_config)
 
     if not watchers:
         logger.error('No configured watchers, nothing to do')
         sys.exit()
 
+    state_store.init_state_store(global_config.core)
+    state_store.restore_watchers(watchers)
+
     watcher_runner = WatcherRunner(global_config, watchers)
 
     outputs = _create_ouputs(global_config.outputs)
@@ -31,10 +38,7 @@ def main(config: str):
     if global_config.core.run_mode == 'once':
         _run_once(watcher_runner, outputs)
     else:
-        while True:
-            _run_once(watcher_runner, outputs)
-            logger.debug('Sleeping %d seconds ...', global_config.core.sleep_duration)
-            time.sleep(global_config.core.sleep_duration)
+        _run_repeat(global_config, watcher_runner, outputs)
 
 
 def _create_watchers(global_config: GlobalConfig) -> Sequence[watcher_manager.Watcher]:
@@ -65,7 +69,55 @@ def _create_ouputs(outputs_conf: output_manager.OutputConfig) -> Sequence[output
 
 
 def _run_once(watcher_runner: WatcherRunner, outputs: Sequence[output_manager.Output]):
-    results = watcher_runner.run()
+    results = watcher_runner.run(on_result=lambda result: _add_result(outputs, result))
+    _write_outputs(outputs, results)
+
+
+def _run_repeat(global_config: GlobalConfig, watcher_runner: WatcherRunner,
+                outputs: Sequence[output_manager.Output]):
+    scheduler = WatcherScheduler(watcher_runner.watchers, global_config.core.sleep_duration)
+    finished = queue.Queue()
+    latest_results = {}
+
+    while True:
+        due_watchers = scheduler.pop_due_watchers()
+        if due_watchers:
+            watcher_runner.submit(
+                due_watchers, lambda watcher, result: finished.put((watcher, result)))
+
+        sleep_duration = scheduler.get_sleep_duration()
+        logger.debug('Sleeping at most %d seconds ...', sleep_duration)
+        try:
+            finished_watchers = [finished.get(timeout=sleep_duration)]
+        except queue.Empty:
+            continue
+        while not finished.empty():
+            finished_watchers.append(finished.get())
+
+        # Each watcher is rescheduled as soon as it's finished,
+        # without waiting for the other running watchers
+        for watcher, result in finished_watchers:
+            latest_results.pop(watcher.config, None)
+            if result:
+                latest_results[watcher.config] = result
+                _add_result(outputs, result)
+            scheduler.reschedule([watcher])
+
+        _write_outputs(outputs, [
+            latest_results[watcher.config] for watcher in watcher_runner.watchers
+            if watcher.config in latest_results
+        ])
+
+
+def _add_result(outputs: Sequence[output_manager.Output], result: WatchResult):
+    state_store.save_result(result)
+    for output in outputs:
+        output.add_result(result)
+
+
+def _write_outputs(outputs: Sequence[output_manager.Output],
+                   results: Sequence[WatchResult]):
     for output in outputs:
         logger.info(' - output : %s', output)
-        output.outputs(results)
+        output.flush(results)
+    cache_manager.save_caches()
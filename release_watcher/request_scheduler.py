@@ -0,0 +1,94 @@
+import logging
+import threading
+import time
+from urllib.parse import urlparse
+from release_watcher.config_models import HostLimitsConfig
+
+logger = logging.getLogger(__name__)
+
+LIMITERS = {}
+
+_LIMITERS_LOCK = threading.Lock()
+
+
+class HostLimiter:
+    """Limits the requests sent to a single host
+
+    * at most max_concurrency requests are in flight at the same time
+    * requests are spaced by a token bucket refilled with requests_per_second
+      tokens each second, allowing bursts of up to one second of requests
+    """
+
+    host: str = None
+    max_concurrency: int = None
+    requests_per_second: float = None
+
+    def __init__(self, host: str, limits: HostLimitsConfig):
+        self.host = host
+        self.max_concurrency = limits.max_concurrency
+        self.requests_per_second = limits.requests_per_second
+
+        self._semaphore = None
+        if self.max_concurrency:
+            self._semaphore = threading.BoundedSemaphore(self.max_concurrency)
+
+        self._lock = threading.Lock()
+        self._capacity = max(1.0, self.requests_per_second or 0)
+        self._tokens = self._capacity
+        self._last_refill = time.monotonic()
+
+    def __enter__(self):
+        if self._semaphore:
+            self._semaphore.acquire()
+        try:
+            self._take_token()
+        except BaseException:
+            if self._semaphore:
+                self._semaphore.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._semaphore:
+            self._semaphore.release()
+
+    def _take_token(self):
+        if not self.requests_per_second:
+            return
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                elapsed = now - self._last_refill
+                self._tokens = min(self._capacity,
+                                   self._tokens + elapsed * self.requests_per_second)
+                self._last_refill = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) / self.requests_per_second
+
+            logger.debug('Request budget for %s exhausted, waiting %.2f s', self.host, wait)
+            time.sleep(wait)
+
+    def __repr__(self):
+        return f'HostLimiter({self.host}, {self.max_concurrency}, {self.requests_per_second})'
+
+
+def get_limiter(url: str, limits: HostLimitsConfig) -> HostLimiter:
+    """Fetches the limiter of the host of an URL
+
+    The limiter is created on the first request to the host with limits,
+    using these limits. Returns None if there is no limit to apply."""
+
+    host = urlparse(url).netloc
+
+    with _LIMITERS_LOCK:
+        if host not in LIMITERS and limits and limits.is_limited():
+            logger.info('Limiting requests to %s : %s concurrent, %s per second',
+                        host, limits.max_concurrency, limits.requests_per_second)
+            LIMITERS[host] = HostLimiter(host, limits)
+
+        return LIMITERS.get(host)
@@ -0,0 +1,177 @@
+import logging
+import datetime
+import hashlib
+import json
+import sqlite3
+import threading
+from typing import Dict, Sequence
+from release_watcher.base_models import WatcherConfig
+from release_watcher.config_models import CoreConfig
+from release_watcher.watchers.watcher_manager import Watcher
+from release_watcher.watchers.watcher_models import Release, WatchResult
+
+logger = logging.getLogger(__name__)
+
+STATE_STORE = None
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS watcher_state (
+    watcher_key TEXT PRIMARY KEY,
+    config_fingerprint TEXT NOT NULL,
+    last_check TEXT NOT NULL,
+    newest_release_name TEXT,
+    newest_release_date TEXT,
+    current_release TEXT,
+    missed_releases TEXT NOT NULL,
+    known_releases TEXT NOT NULL,
+    missed_release_count INTEGER
+)
+'''
+
+class StateStore:
+    """Class that keeps the state of each watcher in a SQLite database
+
+    For each watcher, the releases of its last result, the most recent release
+    seen and the time of the last check are stored, so that a restarted process
+    resumes with the knowledge of the previous one.
+
+    The state of a watcher is ignored if its configuration changed."""
+
+    path: str = None
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        # Results are saved from the thread running the watchers
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(_SCHEMA)
+
+    def restore_watcher(self, watcher: Watcher) -> bool:
+        """Restores the last result of a watcher, returns True if one was found"""
+
+        with self._lock:
+            row = self._connection.execute(
+                'SELECT config_fingerprint, last_check, current_release, missed_releases, '
+                'known_releases, missed_release_count FROM watcher_state WHERE watcher_key = ?',
+                (_get_key(watcher.config),)).fetchone()
+
+        if not row:
+            return False
+
+        fingerprint, last_check, current_release, missed_releases, known_releases, \
+            missed_release_count = row
+        if fingerprint != _get_fingerprint(watcher.config):
+            logger.debug('Configuration of %s changed, ignoring its state', watcher)
+            return False
+
+        result = WatchResult(watcher.config,
+                             _decode_release(json.loads(current_release)),
+                             _decode_releases(json.loads(missed_releases)))
+        result.known_releases = _decode_releases(json.loads(known_releases))
+        result.missed_release_count = missed_release_count
+
+        watcher.last_result = result
+        watcher.last_check = datetime.datetime.fromisoformat(last_check)
+        return True
+
+    def save_result(self, result: WatchResult):
+        """Saves the result of a watcher as its new state"""
+
+        known_releases = result.get_known_releases()
+        newest_release = _get_newest_release(known_releases)
+        last_check = datetime.datetime.now(datetime.timezone.utc)
+
+        with self._lock, self._connection:
+            self._connection.execute(
+                'INSERT OR REPLACE INTO watcher_state VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (_get_key(result.config),
+                 _get_fingerprint(result.config),
+                 last_check.isoformat(),
+                 newest_release.name if newest_release else None,
+                 _encode_date(newest_release.release_date) if newest_release else None,
+                 json.dumps(_encode_release(result.current_release)),
+                 json.dumps(_encode_releases(result.missed_releases)),
+                 json.dumps(_encode_releases(known_releases)),
+                 result.missed_release_count))
+
+
+def init_state_store(core_config: CoreConfig):
+    """Opens the state store, if a state file is configured"""
+
+    global STATE_STORE  # pylint: disable=global-statement
+
+    if core_config.state_file:
+        logger.info('Storing the state of watchers in %s', core_config.state_file)
+        STATE_STORE = StateStore(core_config.state_file)
+
+
+def restore_watchers(watchers: Sequence[Watcher]):
+    """Restores the last result of the watchers from the state store"""
+
+    if not STATE_STORE:
+        return
+
+    restored = 0
+    for watcher in watchers:
+        try:
+            if STATE_STORE.restore_watcher(watcher):
+                restored += 1
+        except (sqlite3.Error, ValueError, KeyError) as e:
+            logger.warning('Error restoring the state of %s, ignoring it : %s', watcher, e)
+
+    logger.info('Restored the state of %d watchers out of %d', restored, len(watchers))
+
+
+def save_result(result: WatchResult):
+    """Saves the result of a watcher in the state store"""
+
+    if not STATE_STORE:
+        return
+
+    try:
+        STATE_STORE.save_result(result)
+    except sqlite3.Error as e:
+        logger.exception('Error saving the state of %s : %s', result.config, e)
+
+
+def _get_key(config: WatcherConfig) -> str:
+    return f'{config.watcher_type_name}:{config.name}:{config}'
+
+
+def _get_fingerprint(config: WatcherConfig) -> str:
+    content = json.dumps(vars(config), sort_keys=True,
+                         default=lambda value: getattr(value, '__dict__', str(value)))
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
+
+
+def _get_newest_release(releases: Sequence[Release]) -> Release:
+    dated_releases = [release for release in releases if release.release_date]
+    if not dated_releases:
+        return None
+    return max(dated_releases, key=lambda release: release.release_date)
+
+
+def _encode_date(date: datetime.datetime) -> str:
+    return date.isoformat() if date else None
+
+
+def _encode_release(release: Release) -> Dict:
+    if not release:
+        return None
+    return {'name': release.name, 'date': _encode_date(release.release_date)}
+
+
+def _encode_releases(releases: Sequence[Release]) -> Sequence[Dict]:
+    return [_encode_release(release) for release in releases]
+
+
+def _decode_release(content: Dict) -> Release:
+    if not content:
+        return None
+    date = datetime.datetime.fromisoformat(content['date']) if content['date'] else None
+    return Release(content['name'], date)
+
+
+def _decode_releases(content: Sequence[Dict]) -> Sequence[Release]:
+    return [_decode_release(release) for release in content]
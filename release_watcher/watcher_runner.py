@@ -1,8 +1,9 @@
 import logging
-from typing import Sequence
-from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from release_watcher.config_models import GlobalConfig
+from release_watcher.watchers import watcher_manager
 from release_watcher.watchers.watcher_manager import Watcher
 from release_watcher.watchers.watcher_models import WatchResult
 
@@ -14,23 +15,85 @@ class WatcherRunner:
 
     config: GlobalConfig = None
     watchers: Sequence[Watcher] = []
+    executor: ThreadPoolExecutor = None
 
     def __init__(self, config: GlobalConfig, watchers: Sequence[Watcher]):
         self.config = config
         self.watchers = watchers
 
-    def run(self) -> Sequence[WatchResult]:
-        """Runs the configured watchers and returns the list of results
+    def run(self, watchers: Sequence[Watcher] = None,
+            on_result: Callable[[WatchResult], None] = None) -> Sequence[WatchResult]:
+        """Runs the watchers and returns the list of results
 
-        Watchers are run sequentially"""
+        By default, all the configured watchers are run.
+
+        If provided, on_result is called with each result as soon as its
+        watcher is finished, from the thread that called run.
+
+        Watchers are run in a thread pool of core.threads threads"""
+
+        if watchers is None:
+            watchers = self.watchers
+
+        self._prepare_watchers(watchers)
+
+        results = self._run_threads(watchers, on_result)
+
+        return list(filter(lambda r: r, results))
+
+    def submit(self, watchers: Sequence[Watcher],
+               on_done: Callable[[Watcher, WatchResult], None]):
+        """Starts the watchers in a long-lived thread pool, without waiting for them
+
+        on_done is called with each watcher and its result (None on error)
+        as soon as the watcher is finished, from the thread that ran it.
+        Watchers submitted later don't wait for the ones already running."""
+
+        if self.executor is None:
+            threads = self.config.core.threads
+            logger.info('Starting a pool of %d threads', threads)
+            self.executor = ThreadPoolExecutor(max_workers=threads)
+
+        self._prepare_watchers(watchers)
+
+        logger.info('Submitting %d watchers', len(watchers))
+        for watcher in watchers:
+            future = self.executor.submit(watcher.watch)
+            future.add_done_callback(
+                lambda f, w=watcher: on_done(w, None if f.exception() else f.result()))
+
+    def _prepare_watchers(self, watchers: Sequence[Watcher]):
+        watchers_by_type = {}
+        for watcher in watchers:
+            watchers_by_type.setdefault(watcher.config.watcher_type_name, []).append(watcher)
+
+        for watcher_type_name, watchers_of_type in watchers_by_type.items():
+            try:
+                watcher_type = watcher_manager.get_watcher_type(watcher_type_name)
+                watcher_type.prepare_watchers(watchers_of_type)
+            except Exception as e:
+                logger.exception('Error preparing %s watchers : %s', watcher_type_name, e)
+
+    def _run_threads(self, watchers: Sequence[Watcher],
+                     on_result: Callable[[WatchResult], None]) -> Sequence[WatchResult]:
         threads = self.config.core.threads
-        logger.info('Running all watchers with %d threads', threads)
+        logger.info('Running %d watchers with %d threads', len(watchers), threads)
 
         with ThreadPoolExecutor(max_workers=threads) as executor:
             futures = [
-                executor.submit(watcher.watch) for watcher in self.watchers
+                executor.submit(watcher.watch) for watcher in watchers
             ]
 
-        results = list(filter(lambda r: r, map(lambda f: f.result(), futures)))
+            for future in as_completed(futures):
+                self._notify_result(future.result(), on_result)
+
+        return [future.result() for future in futures]
+
+    def _notify_result(self, result: WatchResult, on_result: Callable[[WatchResult], None]):
+        if not result or not on_result:
+            return
 
-        return results
+        try:
+            on_result(result)
+        except Exception as e:
+            logger.exception('Error handling the result of %s : %s', result.config, e)
@@ -0,0 +1,67 @@
+import heapq
+import itertools
+import logging
+import time
+from typing import Sequence
+from release_watcher.watchers.watcher_manager import Watcher
+
+logger = logging.getLogger(__name__)
+
+# Watchers due within this number of seconds are run together
+BATCH_WINDOW = 0.5
+
+
+class WatcherScheduler:
+    """Class that decides when each watcher should run in repeat mode
+
+    Watchers are kept in a heap ordered by their next due time.
+    Each watcher is rescheduled interval seconds after the end of its run,
+    the interval being either its own, or the default one."""
+
+    default_interval: int = None
+
+    def __init__(self, watchers: Sequence[Watcher], default_interval: int):
+        self.default_interval = default_interval
+        self._sequence = itertools.count()
+        self._heap = []
+
+        now = time.monotonic()
+        for watcher in watchers:
+            self._push(watcher, now)
+
+    def pop_due_watchers(self) -> Sequence[Watcher]:
+        """Removes and returns the watchers that are due to run now"""
+
+        limit = time.monotonic() + BATCH_WINDOW
+        due_watchers = []
+        while self._heap and self._heap[0][0] <= limit:
+            due_watchers.append(heapq.heappop(self._heap)[2])
+
+        if due_watchers:
+            logger.debug('%d watchers are due', len(due_watchers))
+
+        return due_watchers
+
+    def reschedule(self, watchers: Sequence[Watcher]):
+        """Schedules the next run of watchers that just ran"""
+
+        now = time.monotonic()
+        for watcher in watchers:
+            self._push(watcher, now + self._get_interval(watcher))
+
+    def get_sleep_duration(self) -> float:
+        """Returns the number of seconds until the next watcher is due"""
+
+        if not self._heap:
+            return self.default_interval
+
+        return max(0.0, self._heap[0][0] - time.monotonic())
+
+    def _get_interval(self, watcher: Watcher) -> int:
+        if watcher.config.interval:
+            return watcher.config.interval
+        return self.default_interval
+
+    def _push(self, watcher: Watcher, due_time: float):
+        # The sequence number keeps the heap stable, and avoids comparing watchers
+        heapq.heappush(self._heap, (due_time, next(self._sequence), watcher))
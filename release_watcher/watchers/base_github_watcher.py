@@ -1,24 +1,34 @@
 
 import logging
-from typing import Dict, Sequence
-from abc import ABCMeta
+from typing import Callable, Dict, Iterator, Sequence, Tuple
+from abc import ABCMeta, abstractmethod
 import json
 import time
 import requests
-from release_watcher.watchers.watcher_models import WatchError
-from release_watcher.watchers.watcher_manager import Watcher, WatcherConfig
+from release_watcher import http_client, http_validators
+from release_watcher.config_models import CommonConfig, HostLimitsConfig
+from release_watcher.watchers import github_graphql, github_rate_limit
+from release_watcher.watchers.watcher_models import NotModified, WatchError
+from release_watcher.watchers.watcher_manager import Watcher, WatcherConfig, WatcherType
 
 logger = logging.getLogger(__name__)
 
+GITHUB_PAGE_SIZE = 100
+
 
 class BaseGithubConfig(WatcherConfig):
     """Class to store the configuration for a BaseGithubWatcher"""
 
     repo: str = None
-    username: str = None
-    password: str = None
+    credentials: Sequence[Tuple[str, str]] = None
     timeout: float
     rate_limit_wait_max: int
+    rate_limit_reserve: int = None
+    priority: str = 'normal'
+    host_limits: HostLimitsConfig = None
+    api: str = None
+    graphql_batch_size: int = None
+    probe: bool = False
 
     def __init__(self, watcher_type_name: str, name: str, repo: str):
         super().__init__(watcher_type_name, name)
@@ -28,50 +38,170 @@ class BaseGithubConfig(WatcherConfig):
 class BaseGithubWatcher(Watcher, metaclass=ABCMeta):
     """Base Watcher that implements Github related methods"""
 
+    prefetched_response: Sequence[Dict] = None
+
+    @abstractmethod
+    def get_graphql_fields(self) -> str:
+        """Returns the GraphQL fields to query on the repository of this watcher"""
+
+    @abstractmethod
+    def parse_graphql_repository(self, repository: Dict) -> Sequence[Dict]:
+        """Converts the GraphQL data of the repository to the REST API format"""
+
+    def _get_github_items(self, api_url: str, key: Callable[[Dict], str],
+                          newest_first: bool = True) -> Iterator[Dict]:
+        """Yields the items of a GitHub listing, page by page
+
+        Pages of GITHUB_PAGE_SIZE items are only fetched when the previous
+        one has been consumed, so that watchers can stop at the current release.
+
+        The first page is revalidated : if the listing is sorted newest first,
+        an unchanged first page means that nothing was added.
+
+        Prefetched GraphQL data only holds the first items : once they are
+        consumed, the listing goes on with the REST API, skipping the items
+        already yielded (identified by key)."""
+
+        yielded_keys = set()
+        if self.prefetched_response is not None:
+            logger.debug('Using prefetched GraphQL data for %s', self)
+            response = self.prefetched_response
+            self.prefetched_response = None
+            yield from response
+
+            logger.debug('Current release not in the GraphQL data of %s, listing with REST', self)
+            yielded_keys = {key(item) for item in response}
+
+        separator = '&' if '?' in api_url else '?'
+        page_url = f'{api_url}{separator}per_page={GITHUB_PAGE_SIZE}'
+        first_page = True
+
+        while page_url:
+            response = self._get_github_response(page_url, revalidate=first_page)
+            next_link = response.links.get('next')
+
+            if first_page and (newest_first or not next_link):
+                self._store_validators(response.url, response, self._get_auth())
+            elif first_page:
+                http_validators.forget_validators(response.url, self._get_auth())
+
+            for item in json.loads(response.content):
+                if key(item) not in yielded_keys:
+                    yield item
+
+            page_url = next_link['url'] if next_link else None
+            first_page = False
+
     def _call_github_api(self, api_url: str) -> Sequence[Dict]:
+        return json.loads(self._get_github_response(api_url).content)
+
+    def _get_github_response(self, api_url: str, revalidate: bool = False) -> requests.Response:
         if api_url.startswith('http'):
             github_url = api_url
         else:
             github_url = f'https://api.github.com/repos/{self.config.repo}/{api_url}'
         headers = {'Content-Type': 'application/json'}
-        return self._do_call_api(github_url, headers)
+        return self._do_call_api(github_url, headers, revalidate)
+
+    def _do_call_api(self, github_url: str, headers: Dict,
+                     revalidate: bool = False) -> requests.Response:
+        # A 304 isn't counted in the rate limit, but can only be used
+        # if the result of the previous run is known
+        request_headers = headers
+        if revalidate and self.last_result:
+            request_headers = http_validators.add_validator_headers(
+                github_url, headers, self._get_auth())
+
+        auth = github_rate_limit.select_credentials(self.config.credentials)
+        username = auth[0] if auth else None
+        github_rate_limit.acquire(self.config, username)
+        response = http_client.get(github_url, headers=request_headers, auth=auth,
+                                   timeout=self.config.timeout,
+                                   host_limits=self.config.host_limits)
+        github_rate_limit.update(username, response.headers)
+
+        if response.status_code == 304:
+            raise NotModified()
 
-    def _do_call_api(self, github_url: str, headers: Dict) -> Sequence[Dict]:
+        if response.status_code == 200:
+            return response
 
-        if self.config.username:
-            auth = (self.config.username, self.config.password)
-        else:
-            auth = None
+        logger.debug('Github api call failed : code = %s, content = %s',
+                     response.status_code, response.content)
 
-        response = requests.get(github_url, headers=headers, auth=auth, timeout=self.config.timeout)
+        if response.headers.get('X-RateLimit-Remaining') == '0':
+            return self._handle_rate_limit(github_url, headers, revalidate, response)
 
-        if response.status_code == 200:
-            res = json.loads(response.content.decode('utf-8'))
-        else:
-            logger.debug('Github api call failed : code = %s, content = %s',
-                         response.status_code, response.content)
+        raise WatchError(f'Github api call failed : {response}')
+
+    def _get_auth(self) -> Tuple:
+        """Returns the first credentials of the watcher, used to identify its cached validators
 
-            if response.headers.get('X-RateLimit-Remaining') == '0':
-                res = self._handle_rate_limit(github_url, headers, response)
-            else:
-                raise WatchError(f'Github api call failed : {response}')
+        The credentials of the pool are expected to see the same data."""
 
-        return res
+        if self.config.credentials:
+            return self.config.credentials[0]
+        return None
 
-    def _handle_rate_limit(self, github_url: str, headers: Dict, response) -> Sequence[Dict]:
+    def _handle_rate_limit(self, github_url: str, headers: Dict, revalidate: bool,
+                           response) -> requests.Response:
         rl_limit = int(response.headers.get('X-RateLimit-Limit'))
         rl_reset = int(response.headers.get('X-RateLimit-Reset'))
         logger.info('Rate limit exeeded (%d)', rl_limit)
 
+        if github_rate_limit.has_budget(self.config.credentials):
+            logger.debug('Retrying with other credentials')
+            return self._do_call_api(github_url, headers, revalidate)
+
         if rl_reset:
             rl_reset_sec = rl_reset - int(time.time())
 
             if rl_reset_sec <= self.config.rate_limit_wait_max:
                 logger.debug('Rate limit will reset in %d seconds, waiting ...', rl_reset_sec)
                 time.sleep(rl_reset_sec)
-                return self._do_call_api(github_url, headers)
+                return self._do_call_api(github_url, headers, revalidate)
 
             raise WatchError('Github rate limit exeeded, and reset is too far '
                              f'({rl_reset_sec}s > {self.config.rate_limit_wait_max}s)')
 
         raise WatchError('Github rate limit exeeded with no reset')
+
+
+class BaseGithubWatcherType(WatcherType, metaclass=ABCMeta):
+    """Base WatcherType for the GitHub watchers"""
+
+    def _parse_github_config(self, config: BaseGithubConfig, common_config: CommonConfig,
+                             watcher_config: Dict):
+        """Parses the settings shared by all the GitHub watchers into config"""
+
+        config.credentials = self._parse_credentials(common_config, watcher_config)
+        config.timeout = watcher_config.get('timeout', common_config.github.timeout)
+        config.rate_limit_wait_max = watcher_config.get(
+            'rate_limit_wait_max', common_config.github.rate_limit_wait_max)
+        config.rate_limit_reserve = common_config.github.rate_limit_reserve
+        config.priority = watcher_config.get('priority', 'normal')
+        if config.priority not in github_rate_limit.PRIORITIES:
+            raise ValueError(f'Unknown priority {config.priority} for {config.name}, '
+                             f'expected one of {github_rate_limit.PRIORITIES}')
+        config.host_limits = common_config.github.host_limits
+        config.interval = self._parse_interval(config.name, watcher_config,
+                                               common_config.github.interval)
+        config.api = watcher_config.get('api', common_config.github.api)
+        config.graphql_batch_size = common_config.github.graphql_batch_size
+
+    def _parse_credentials(self, common_config: CommonConfig,
+                           watcher_config: Dict) -> Sequence[Tuple[str, str]]:
+        """Returns the credentials of a watcher : its own username and password if set,
+        or the credentials pool of the common settings"""
+
+        if 'username' in watcher_config:
+            return [(watcher_config['username'], watcher_config.get('password'))]
+        return common_config.github.credentials
+
+    def prepare_watchers(self, watchers: Sequence[BaseGithubWatcher]):
+        for watcher in watchers:
+            watcher.prefetched_response = None
+
+        graphql_watchers = [w for w in watchers if w.config.api == 'graphql']
+        if graphql_watchers:
+            github_graphql.prefetch_watchers(graphql_watchers)
@@ -0,0 +1,19 @@
+import datetime
+import functools
+import dateutil.parser
+
+# Dates are often parsed again on the next runs, and the results are immutable
+PARSED_DATES_CACHE_SIZE = 65536
+
+
+@functools.lru_cache(maxsize=PARSED_DATES_CACHE_SIZE)
+def parse_iso_date(date_string: str) -> datetime.datetime:
+    """Parses an ISO 8601 date, as returned by the APIs of GitHub, PyPI or docker registries
+
+    datetime.fromisoformat handles these dates much faster than dateutil,
+    which is only used for the few strings it rejects."""
+
+    try:
+        return datetime.datetime.fromisoformat(date_string)
+    except ValueError:
+        return dateutil.parser.parse(date_string)
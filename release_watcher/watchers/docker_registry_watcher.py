@@ -1,19 +1,32 @@
 import logging
 import json
-from typing import Dict, Sequence
-import re
+import threading
+from typing import Callable, Dict, Iterable, Iterator, Sequence, Tuple
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 import requests
-import www_authenticate
-import dateutil.parser
-from release_watcher.config_models import CommonConfig
-from release_watcher.watchers.watcher_models import Release, WatchError, WatchResult
+from release_watcher import cache_manager, http_client, http_validators
+from release_watcher.config_models import CommonConfig, HostLimitsConfig
+from release_watcher.watchers.watcher_models import NotModified, Release, WatchError, \
+    WatchResult
 from release_watcher.watchers.watcher_manager import Watcher, WatcherConfig, WatcherType
+from release_watcher.watchers import registry_auth, version_ordering
+from release_watcher.watchers.release_filter import ReleaseFilter
+from release_watcher.watchers.date_parser import parse_iso_date
 
 logger = logging.getLogger(__name__)
 
 WATCHER_TYPE_NAME = 'docker_registry'
 
+DATE_CACHE_NAME = 'docker_dates'
+
+DOCKER_HUB_REGISTRY = 'registry-1.docker.io'
+DOCKER_HUB_API_URL = 'https://hub.docker.com/v2'
+DOCKER_HUB_PAGE_SIZE = 100
+
+# Marks the threads dating tags, so that they don't wait for each other
+_DATE_WORKER = threading.local()
+
 
 class DockerRegistryWatcherConfig(WatcherConfig):
     """Class to store the configuration for a DockerRegistryWatcher"""
@@ -23,7 +36,16 @@ class DockerRegistryWatcherConfig(WatcherConfig):
     tag: str = None
     includes: Sequence[str] = []
     excludes: Sequence[str] = []
+    release_filter: ReleaseFilter = None
     timeout: float
+    cache_size: int
+    page_size: int = None
+    ordering: str = 'date'
+    date_concurrency: int = None
+    platform: str = None
+    hub_api: bool = True
+    probe_tag: str = None
+    host_limits: HostLimitsConfig = None
 
     def __init__(self, name: str, repo: str, image: str, tag: str,
                  includes: Sequence[str], excludes: Sequence[str], timeout: float):
@@ -43,26 +65,78 @@ class DockerRegistryWatcher(Watcher):
     """Implementation of a Watcher that checks for new tags in a Docker
     Registry"""
 
-    auth_token: str = None
+    date_cache: cache_manager.PersistentLruCache = None
+    date_executor: ThreadPoolExecutor = None
 
     def __init__(self, config: DockerRegistryWatcherConfig):
         super().__init__(config)
-        self.auth_token = None
+        self.date_cache = cache_manager.get_cache(DATE_CACHE_NAME, config.cache_size)
 
     def _do_watch(self) -> WatchResult:
         logger.debug('Watching docker registry %s', self.config)
-        tags = self._get_all_tags_from_registry()
 
-        for ire in self.config.includes:
-            tags = [tag for tag in tags if re.compile(ire).match(tag)]
+        # A single pool per run bounds the requests of both the tags and the platforms of an index
+        with ThreadPoolExecutor(max_workers=max(1, self.config.date_concurrency),
+                                thread_name_prefix=f'{self.config.name}-dates',
+                                initializer=_mark_date_worker) as executor:
+            self.date_executor = executor
+            try:
+                return self._watch_tags()
+            finally:
+                self.date_executor = None
+
+    def _watch_tags(self) -> WatchResult:
+        if self.config.probe_tag:
+            result = self._probe_current_tag()
+            if result:
+                return result
+
+        listed_dates = None
+        if self.config.hub_api and self.config.repo == DOCKER_HUB_REGISTRY:
+            listed_dates = self._get_hub_tag_dates()
+
+        if listed_dates is not None:
+            tags = iter(listed_dates)
+        else:
+            listed_dates = {}
+            tags = self._iter_tags_from_registry()
+
+        tags = self.config.release_filter.filter(tags)
+
+        if self.config.ordering == 'date':
+            return self._watch_by_date(tags, listed_dates)
+        return self._watch_by_version(tags, listed_dates)
 
-        for ere in self.config.excludes:
-            tags = [tag for tag in tags if not re.compile(ere).match(tag)]
+    def _probe_current_tag(self) -> WatchResult:
+        """Checks if probe_tag points to the same image as the current tag
 
-        releases = []
-        for tag in tags:
-            tag_date = self._get_tag_date(tag)
-            releases.append(Release(tag, tag_date))
+        probe_tag is a moving tag (latest, 3-alpine...) following the newest
+        release : if both tags have the same digest, nothing newer was
+        released. Returns None otherwise."""
+
+        current_digest = self._get_tag_digest(*self._get_manifest_request(self.config.tag))
+        probe_digest = self._get_tag_digest(*self._get_manifest_request(self.config.probe_tag))
+        if not current_digest or current_digest != probe_digest:
+            logger.debug('Tag %s (%s) is not the current one (%s)',
+                         self.config.probe_tag, probe_digest, current_digest)
+            return None
+
+        logger.debug('Tag %s is the current one (%s)', self.config.probe_tag, current_digest)
+        if self.last_result and self.last_result.current_release \
+                and self.last_result.current_release.name == self.config.tag:
+            current_release = self.last_result.current_release
+        else:
+            current_release = Release(self.config.tag, self._get_tag_date(self.config.tag))
+
+        result = WatchResult(self.config, current_release, [])
+        # The tags listed by the last full run are still known
+        if self.last_result:
+            result.known_releases = self.last_result.known_releases
+        return result
+
+    def _watch_by_date(self, tags: Iterable[str],
+                       listed_dates: Dict[str, datetime.datetime]) -> WatchResult:
+        releases = self._get_tag_releases(list(tags), listed_dates)
 
         # Sort with most recent first
         releases.sort(key=lambda r: r.release_date, reverse=True)
@@ -82,65 +156,162 @@ class DockerRegistryWatcher(Watcher):
         if not current_release:
             logger.warning('Current tag %s not found !', current_tag)
 
+        logger.debug('Missed tags : %s', missed_releases)
+        result = WatchResult(self.config, current_release, missed_releases)
+        result.known_releases = releases
+        return result
+
+    def _watch_by_version(self, tags: Iterable[str],
+                          listed_dates: Dict[str, datetime.datetime]) -> WatchResult:
+        # Only the tags with a greater version than the current one need a date
+        current_tag = self.config.tag
+        current_found, newer_tags = version_ordering.select_newer_versions(
+            self.config.ordering, tags, current_tag)
+
+        if current_found:
+            *missed_releases, current_release = self._get_tag_releases(
+                newer_tags + [current_tag], listed_dates)
+        else:
+            missed_releases = self._get_tag_releases(newer_tags, listed_dates)
+            current_release = None
+            logger.warning('Current tag %s not found !', current_tag)
+
         logger.debug('Missed tags : %s', missed_releases)
         return WatchResult(self.config, current_release, missed_releases)
 
-    def _get_all_tags_from_registry(self, page_url=None) -> Sequence[str]:
-        api_response = self._call_registry_api_tags_list(page_url)
+    def _get_tag_releases(self, tags: Sequence[str],
+                          listed_dates: Dict[str, datetime.datetime]) -> Sequence[Release]:
+        # Tags can be moved to another image (latest, 3-alpine...) : their dates are
+        # not reused by name, but the date of a known digest is cached
+        tag_dates = self._map_concurrently(
+            lambda tag: listed_dates.get(tag) or self._get_tag_date(tag), tags)
+        return [Release(tag, tag_date) for tag, tag_date in zip(tags, tag_dates)]
+
+    def _map_concurrently(self, function: Callable, items: Sequence) -> Sequence:
+        """Applies the function to all the items, with up to date_concurrency calls at once
+
+        Calls made from a worker of the pool (the platforms of an index
+        dated along with other tags) are run in that worker, so that the whole
+        run never exceeds date_concurrency requests.
+
+        The requests still go through the limits of the registry host, shared
+        with all the other watchers."""
+
+        if self.config.date_concurrency <= 1 or len(items) <= 1 or not self.date_executor \
+                or getattr(_DATE_WORKER, 'active', False):
+            return [function(item) for item in items]
+
+        return list(self.date_executor.map(function, items))
+
+    def _get_hub_tag_dates(self) -> Dict[str, datetime.datetime]:
+        """Lists the tags of a Docker Hub image with their date, using the Hub API
+
+        The Hub API returns the last update date of each tag in the listing,
+        so no manifest needs to be fetched. Tags are listed most recently
+        updated first : with the date ordering, the listing stops at the page
+        containing the current tag.
+
+        Returns None if the Hub API failed, to fall back to the registry API."""
+
+        hub_url = f'{DOCKER_HUB_API_URL}/repositories/{self.config.image}/tags' \
+            f'?page_size={DOCKER_HUB_PAGE_SIZE}&ordering=last_updated'
+        headers = {'Content-Type': 'application/json'}
+        tag_dates = {}
+
+        try:
+            while hub_url:
+                response = http_client.get(hub_url, headers=headers,
+                                           timeout=self.config.timeout,
+                                           host_limits=self.config.host_limits)
+                if response.status_code != 200:
+                    raise WatchError(f'Docker Hub api call failed, '
+                                     f'response code {response.status_code}')
+
+                content = json.loads(response.content.decode('utf-8'))
+                for tag in content['results']:
+                    last_updated = tag.get('last_updated')
+                    tag_dates[tag['name']] = \
+                        parse_iso_date(last_updated) if last_updated else None
+
+                if self.config.ordering == 'date' and self.config.tag in tag_dates:
+                    logger.debug('Current tag %s found, older tags are not listed', self.config.tag)
+                    break
+                hub_url = content.get('next')
+        except Exception as e:
+            logger.warning('Error listing %s with the Docker Hub API, '
+                           'falling back to the registry API : %s', self.config, e)
+            return None
+
+        return tag_dates
+
+    def _iter_tags_from_registry(self) -> Iterator[str]:
+        """Yields the tags of the image, page by page
+
+        Pages of page_size tags are only fetched when the previous one has
+        been consumed, so that a consumer can stop early."""
+
+        page_url = f'/v2/{self.config.image}/tags/list?n={self.config.page_size}'
+        first_page = True
+
+        while page_url:
+            api_response = self._get_tags_page(page_url, first_page)
+            content = json.loads(api_response.content.decode('utf-8'))
+            next_link = api_response.links.get('next')
+
+            # A single page listing can be revalidated, but a 304 on the first page
+            # doesn't mean that the next ones didn't change
+            if first_page and not next_link:
+                self._store_validators(api_response.url, api_response)
+            elif first_page:
+                http_validators.forget_validators(api_response.url)
+
+            logger.debug('Fetched %d tags, next page : %s', len(content['tags'] or []),
+                         next_link['url'] if next_link else None)
+            yield from content['tags'] or []
+
+            page_url = next_link['url'] if next_link else None
+            first_page = False
+
+    def _get_tags_page(self, page_url: str, revalidate: bool) -> requests.Response:
+        api_response = self._call_registry_api_tags_list(page_url, revalidate)
 
         if api_response.status_code == 401:
             if 'Www-Authenticate' in api_response.headers:
                 logger.debug('Auhentication required, requesting a token')
-                self.auth_token = self._call_docker_registry_api_auth(
-                    api_response.headers['Www-Authenticate'])
-                api_response = self._call_registry_api_tags_list(page_url)
+                registry_auth.authenticate(self.config, api_response.headers['Www-Authenticate'])
+                api_response = self._call_registry_api_tags_list(page_url, revalidate)
             else:
                 raise Exception('Authentication required, but no authentication method provided !')
 
+        if api_response.status_code == 304:
+            raise NotModified()
+
         if api_response.status_code == 200:
-            content = json.loads(api_response.content.decode('utf-8'))
-            tags = content['tags']
-            if 'next' in api_response.links:
-                next_url = api_response.links['next']['url']
-                next_tags = self._get_all_tags_from_registry(next_url)
-                tags += next_tags
-            return tags
+            return api_response
 
         raise Exception(
             f'Docker registry api call failed, response code {api_response.status_code}')
 
-    def _call_registry_api_tags_list(self, page_url=None) -> requests.Response:
-        if page_url:
-            docker_repo_url = f'https://{self.config.repo}{page_url}'
-        else:
-            docker_repo_url = f'https://{self.config.repo}/v2/{self.config.image}/tags/list'
+    def _call_registry_api_tags_list(self, page_url: str, revalidate: bool) -> requests.Response:
+        docker_repo_url = f'https://{self.config.repo}{page_url}'
         headers = {'Content-Type': 'application/json'}
 
-        if self.auth_token:
-            headers['Authorization'] = f'Bearer {self.auth_token}'
-
-        response = requests.get(docker_repo_url, headers=headers, timeout=self.config.timeout)
-        return response
+        self._add_auth_header(headers)
 
-    def _call_docker_registry_api_auth(self, authenticate_header: str) -> str:
-        parsed_hearder = www_authenticate.parse(authenticate_header)
-        realm = parsed_hearder['bearer']['realm']
-        auth_params = []
+        if revalidate and self.last_result:
+            headers = http_validators.add_validator_headers(docker_repo_url, headers)
 
-        for key in parsed_hearder['bearer']:
-            if key != 'realm':
-                auth_params.append(f'{key}={parsed_hearder["bearer"][key]}')
-        auth_url = f'{realm}?{"&".join(auth_params)}'
-        headers = {'Content-Type': 'application/json'}
-        response = requests.get(auth_url, headers=headers, timeout=self.config.timeout)
-
-        if response.status_code == 200:
-            content = json.loads(response.content.decode('utf-8'))
-            return content['token']
+        response = http_client.get(docker_repo_url, headers=headers,
+                                   timeout=self.config.timeout,
+                                   host_limits=self.config.host_limits)
+        return response
 
-        raise WatchError(f'Authentication failed, response code {response.status_code}')
+    def _add_auth_header(self, headers: Dict):
+        auth_token = registry_auth.get_token(self.config)
+        if auth_token:
+            headers['Authorization'] = f'Bearer {auth_token}'
 
-    def _get_tag_date(self, tag: str) -> datetime:
+    def _get_manifest_request(self, tag: str) -> Tuple[str, Dict]:
         docker_repo_url = f'https://{self.config.repo}/v2/{self.config.image}/manifests/{tag}'
         headers = {
             'Accept': ','.join([
@@ -150,25 +321,34 @@ class DockerRegistryWatcher(Watcher):
             ])
         }
 
-        if self.auth_token:
-            headers['Authorization'] = f'Bearer {self.auth_token}'
+        self._add_auth_header(headers)
+        return docker_repo_url, headers
 
-        response = requests.get(docker_repo_url, headers=headers, timeout=self.config.timeout)
+    def _get_tag_date(self, tag: str) -> datetime:
+        docker_repo_url, headers = self._get_manifest_request(tag)
+
+        # Manifests and blobs are addressed by their digest, and thus immutable :
+        # a cheap HEAD request is enough to know if the date is already known
+        digest = self._get_tag_digest(docker_repo_url, headers)
+        if self._get_tag_cache_key(digest) in self.date_cache:
+            logger.debug('Date of tag %s found in cache (%s)', tag, digest)
+            return self._get_cached_date(self._get_tag_cache_key(digest))
+
+        response = http_client.get(docker_repo_url, headers=headers,
+                                   timeout=self.config.timeout,
+                                   host_limits=self.config.host_limits)
         if response.status_code == 200:
             content = json.loads(response.content.decode('utf-8'))
-            tag_date = None
+            digest = response.headers.get('Docker-Content-Digest', digest)
 
             if 'manifests' in content:
-                for manifest in content['manifests']:
-                    m_date = self._get_date_from_manifest(manifest['digest'])
-                    if m_date is None:
-                        continue
-
-                    if tag_date is None or m_date > tag_date:
-                        tag_date = m_date
+                tag_date = self._get_date_from_index(content['manifests'])
             else:
                 tag_date = self._get_tag_date_from_config(content['config']['digest'])
 
+            if digest:
+                self._cache_date(self._get_tag_cache_key(digest), tag_date)
+
             return tag_date
 
         logger.debug('Docker registry api call failed, response code %d', response.status_code)
@@ -176,7 +356,49 @@ class DockerRegistryWatcher(Watcher):
         logger.debug('content: %s', response.content)
         raise WatchError(f'Docker registry api call failed, response code {response.status_code}')
 
+    def _get_date_from_index(self, manifests: Sequence[Dict]) -> datetime:
+        # Attestations (provenance, SBOM...) are not images, and have no date
+        manifests = [m for m in manifests if not _is_attestation(m)]
+
+        if not self.config.platform:
+            # Most recent date of all the platforms
+            manifest_dates = self._map_concurrently(
+                lambda manifest: self._get_date_from_manifest(manifest['digest']), manifests)
+            return max((m_date for m_date in manifest_dates if m_date), default=None)
+
+        candidates = [m for m in manifests if _matches_platform(m, self.config.platform)]
+        if not candidates:
+            if self.config.platform != 'first':
+                logger.debug('Platform %s not found, using the first resolvable one',
+                             self.config.platform)
+            candidates = manifests
+
+        for manifest in candidates:
+            m_date = self._get_date_from_manifest(manifest['digest'])
+            if m_date:
+                return m_date
+        return None
+
+    def _get_tag_cache_key(self, digest: str) -> str:
+        # The date of an index depends on the platforms considered
+        if digest and self.config.platform:
+            return f'{digest}|{self.config.platform}'
+        return digest
+
+    def _get_tag_digest(self, docker_repo_url: str, headers: Dict) -> str:
+        response = http_client.head(docker_repo_url, headers=headers,
+                                    timeout=self.config.timeout,
+                                    host_limits=self.config.host_limits)
+        if response.status_code == 200:
+            return response.headers.get('Docker-Content-Digest')
+
+        logger.debug('Docker registry HEAD call failed, response code %d', response.status_code)
+        return None
+
     def _get_date_from_manifest(self, digest: str) -> datetime:
+        if digest in self.date_cache:
+            return self._get_cached_date(digest)
+
         api_url = f'https://{self.config.repo}/v2/{self.config.image}/manifests/{digest}'
         headers = {
             'Accept': ','.join([
@@ -185,13 +407,16 @@ class DockerRegistryWatcher(Watcher):
             ])
         }
 
-        if self.auth_token:
-            headers['Authorization'] = f'Bearer {self.auth_token}'
+        self._add_auth_header(headers)
 
-        response = requests.get(api_url, headers=headers, timeout=self.config.timeout)
+        response = http_client.get(api_url, headers=headers,
+                                   timeout=self.config.timeout,
+                                   host_limits=self.config.host_limits)
         if response.status_code == 200:
             content = json.loads(response.content.decode('utf-8'))
-            return self._get_tag_date_from_config(content['config']['digest'])
+            manifest_date = self._get_tag_date_from_config(content['config']['digest'])
+            self._cache_date(digest, manifest_date)
+            return manifest_date
 
         logger.debug('Docker registry api call failed, response code %d', response.status_code)
         logger.debug('headers : %s', response.headers)
@@ -199,6 +424,9 @@ class DockerRegistryWatcher(Watcher):
         raise WatchError(f'Docker registry api call failed, response code {response.status_code}')
 
     def _get_tag_date_from_config(self, digest: str) -> datetime:
+        if digest in self.date_cache:
+            return self._get_cached_date(digest)
+
         api_url = f'https://{self.config.repo}/v2/{self.config.image}/blobs/{digest}'
         headers = {
             'Accept': ','.join([
@@ -207,19 +435,50 @@ class DockerRegistryWatcher(Watcher):
             ])
         }
 
-        if self.auth_token:
-            headers['Authorization'] = f'Bearer {self.auth_token}'
+        self._add_auth_header(headers)
 
-        response = requests.get(api_url, headers=headers, timeout=self.config.timeout)
+        response = http_client.get(api_url, headers=headers,
+                                   timeout=self.config.timeout,
+                                   host_limits=self.config.host_limits)
         if response.status_code == 200:
             content = json.loads(response.content.decode('utf-8'))
-            return dateutil.parser.parse(content['created']) if 'created' in content else None
+            config_date = None
+            if 'created' in content:
+                config_date = parse_iso_date(content['created'])
+            self._cache_date(digest, config_date)
+            return config_date
 
         logger.debug('Docker registry api call failed, response code %d', response.status_code)
         logger.debug('headers : %s', response.headers)
         logger.debug('content: %s', response.content)
         raise WatchError(f'Docker registry api call failed, response code {response.status_code}')
 
+    def _get_cached_date(self, digest: str) -> datetime:
+        date_string = self.date_cache.get(digest)
+        return parse_iso_date(date_string) if date_string else None
+
+    def _cache_date(self, digest: str, date: datetime):
+        self.date_cache.put(digest, date.isoformat() if date else None)
+
+
+def _mark_date_worker():
+    _DATE_WORKER.active = True
+
+
+def _is_attestation(manifest: Dict) -> bool:
+    annotations = manifest.get('annotations', {})
+    platform = manifest.get('platform', {})
+    return annotations.get('vnd.docker.reference.type') == 'attestation-manifest' \
+        or (platform.get('os'), platform.get('architecture')) == ('unknown', 'unknown')
+
+
+def _matches_platform(manifest: Dict, platform: str) -> bool:
+    manifest_platform = manifest.get('platform', {})
+    os_arch = f'{manifest_platform.get("os")}/{manifest_platform.get("architecture")}'
+    if manifest_platform.get('variant'):
+        return platform in (os_arch, f'{os_arch}/{manifest_platform["variant"]}')
+    return platform == os_arch
+
 
 class DockerRegistryWatcherType(WatcherType):
     """Class to represent the DockerRegistryWatcher type of Watcher"""
@@ -232,7 +491,7 @@ class DockerRegistryWatcherType(WatcherType):
         repo = watcher_config['repo']
         image = watcher_config['image']
 
-        if repo == 'registry-1.docker.io' and '/' not in image:
+        if repo == DOCKER_HUB_REGISTRY and '/' not in image:
             image = f'library/{image}'
 
         tag = str(watcher_config['tag'])
@@ -241,7 +500,30 @@ class DockerRegistryWatcherType(WatcherType):
         name = watcher_config.get('name', f'{repo}:{image}')
         timeout = watcher_config.get('timeout', common_config.docker.timeout)
 
-        return DockerRegistryWatcherConfig(name, repo, image, tag, includes, excludes, timeout)
+        config = DockerRegistryWatcherConfig(name, repo, image, tag, includes, excludes, timeout)
+        config.release_filter = ReleaseFilter(includes, excludes)
+        config.cache_size = common_config.docker.cache_size
+        config.page_size = watcher_config.get('page_size', common_config.docker.page_size)
+        config.date_concurrency = watcher_config.get(
+            'date_concurrency', common_config.docker.date_concurrency)
+        config.platform = watcher_config.get('platform', common_config.docker.platform)
+        config.hub_api = watcher_config.get('hub_api', common_config.docker.hub_api)
+        if 'probe_tag' in watcher_config:
+            config.probe_tag = str(watcher_config['probe_tag'])
+        if config.platform and config.platform != 'first' and '/' not in config.platform:
+            raise ValueError(f'Invalid platform {config.platform} for {name}, '
+                             'expected os/architecture[/variant] or first')
+        config.ordering = watcher_config.get('ordering', 'date')
+        if config.ordering not in version_ordering.ORDERINGS:
+            raise ValueError(f'Unknown ordering {config.ordering} for {name}, '
+                             f'expected one of {version_ordering.ORDERINGS}')
+        config.host_limits = common_config.docker.host_limits
+        config.interval = self._parse_interval(name, watcher_config, common_config.docker.interval)
+
+        return config
+
+    def prepare_watchers(self, watchers: Sequence[DockerRegistryWatcher]):
+        registry_auth.prefetch_tokens([watcher.config for watcher in watchers])
 
     def create_watcher(self, watcher_config: DockerRegistryWatcherConfig) -> DockerRegistryWatcher:
         return DockerRegistryWatcher(watcher_config)
@@ -1,21 +1,26 @@
 import logging
-from typing import Dict
-import dateutil.parser
+from typing import Dict, Iterable, Iterator, Sequence
+import json
+from release_watcher import http_validators
 from release_watcher.config_models import CommonConfig
-from release_watcher.watchers.watcher_models import Release, WatchResult
-from release_watcher.watchers.watcher_manager import WatcherType
-from release_watcher.watchers.base_github_watcher import BaseGithubWatcher, BaseGithubConfig
+from release_watcher.watchers.watcher_models import Release, WatchError, WatchResult
+from release_watcher.watchers.date_parser import parse_iso_date
+from release_watcher.watchers.base_github_watcher import \
+    GITHUB_PAGE_SIZE, BaseGithubWatcher, BaseGithubConfig, BaseGithubWatcherType
 
 logger = logging.getLogger(__name__)
 
 WATCHER_TYPE_NAME = 'github_commit'
 
+MODES = ['history', 'compare', 'count']
+
 
 class GithubCommitWatcherConfig(BaseGithubConfig):
     """Class to store the configuration for a GithubCommitWatcher"""
 
     branch: str = None
     commit: str = None
+    mode: str = 'history'
 
     def __init__(self, name: str, repo: str, branch: str, commit: str):
         super().__init__(WATCHER_TYPE_NAME, name, repo)
@@ -34,20 +39,26 @@ class GithubCommitWatcher(BaseGithubWatcher):
 
     def _do_watch(self) -> WatchResult:
         logger.debug('Watching Github commit %s', self.config)
+        # Prefetched GraphQL data is already available at no cost
+        if self.config.probe and self.prefetched_response is None:
+            result = self._probe_branch_head()
+            if result:
+                return result
+
+        if self.config.mode != 'history':
+            return self._watch_with_compare()
+
+        known_commits = self._get_known_commits()
         api_url = f'commits?sha={self.config.branch}'
-        response = self._call_github_api(api_url)
+        response = self._get_github_items(api_url, lambda c: c['sha'])
         current_commit_hash = self.config.commit
         current_commit_release = None
         missed_commits = []
 
-        for commit in response:
-            new_commit = commit['sha']
+        for commit in self._merge_known_commits(response, known_commits):
+            new_commit = commit.name
             logger.debug(' - %s', new_commit)
 
-            new_commit_date = dateutil.parser.parse(
-                commit['commit']['committer']['date'])
-            commit = Release(new_commit, new_commit_date)
-
             if new_commit == current_commit_hash:
                 logger.debug('Current commit %s found', current_commit_hash)
                 current_commit_release = commit
@@ -62,8 +73,147 @@ class GithubCommitWatcher(BaseGithubWatcher):
         logger.debug('Missed commits : %s', missed_commits)
         return WatchResult(self.config, current_commit_release, missed_commits)
 
+    def _probe_branch_head(self) -> WatchResult:
+        """Checks if the head of the branch is still the current commit
+
+        Only the sha of the head commit is requested. The date of the current
+        commit comes from the previous result, so the probe is only used once
+        the current commit has been found."""
+
+        if not self.last_result or not self.last_result.current_release \
+                or self.last_result.current_release.name != self.config.commit:
+            return None
+
+        github_url = f'https://api.github.com/repos/{self.config.repo}/commits/{self.config.branch}'
+        try:
+            response = self._do_call_api(github_url, {'Accept': 'application/vnd.github.sha'})
+        except WatchError as e:
+            logger.debug('Error fetching the head of %s, listing commits : %s',
+                         self.config.branch, e)
+            return None
+
+        head_commit = response.content.decode('utf-8').strip()
+        if head_commit != self.config.commit:
+            logger.debug('Head commit %s is not the current one', head_commit)
+            return None
+
+        logger.debug('Current commit %s is the head of %s', head_commit, self.config.branch)
+        result = WatchResult(self.config, self.last_result.current_release, [])
+        # The known commits are still the base of the next incremental listing
+        result.known_releases = self.last_result.get_known_releases()
+        return result
+
+    def _watch_with_compare(self) -> WatchResult:
+        """Watches the branch with the compare API
+
+        A single call returns the number of commits of the branch after the
+        current one (ahead_by). In count mode, the missed commits themselves
+        are not listed."""
+
+        count_only = self.config.mode == 'count'
+        api_url = f'compare/{self.config.commit}...{self.config.branch}'
+        api_url += f'?per_page={1 if count_only else GITHUB_PAGE_SIZE}'
+        response = self._get_github_response(api_url, revalidate=True)
+        next_link = response.links.get('next')
+        comparison = json.loads(response.content)
+
+        if count_only or not next_link:
+            self._store_validators(response.url, response, self._get_auth())
+        else:
+            http_validators.forget_validators(response.url, self._get_auth())
+
+        base_commit = comparison['base_commit']
+        current_commit = Release(base_commit['sha'],
+                                 parse_iso_date(base_commit['commit']['committer']['date']))
+
+        if comparison['status'] in ['behind', 'diverged']:
+            logger.warning('Current commit %s is not in the history of %s (%s)',
+                           self.config.commit, self.config.branch, comparison['status'])
+
+        missed_commits = []
+        if not count_only:
+            for commit in self._iter_compare_commits(comparison, next_link):
+                commit_date = parse_iso_date(commit['commit']['committer']['date'])
+                missed_commits.append(Release(commit['sha'], commit_date))
+            # Commits are listed oldest first
+            missed_commits.reverse()
+
+        logger.debug('%d missed commits : %s', comparison['ahead_by'], missed_commits)
+        result = WatchResult(self.config, current_commit, missed_commits)
+        result.missed_release_count = comparison['ahead_by']
+        return result
+
+    def _iter_compare_commits(self, comparison: Dict, next_link: Dict) -> Iterator[Dict]:
+        yield from comparison['commits']
+
+        while next_link:
+            response = self._get_github_response(next_link['url'])
+            next_link = response.links.get('next')
+            yield from json.loads(response.content)['commits']
+
+    def _get_known_commits(self) -> Sequence[Release]:
+        # The previous result can only be extended if it went up to the current commit
+        if not self.last_result or not self.last_result.current_release:
+            return []
+        return self.last_result.get_known_releases()
+
+    def _merge_known_commits(self, response: Iterable[Dict],
+                             known_commits: Sequence[Release]) -> Iterator[Release]:
+        """Merges the history listed from the head of the branch with the known commits
+
+        New commits can be older than known ones (commits brought by a merge),
+        so the listing goes on past the first known commit until the parents
+        of all the new commits have been listed : the rest of the history is
+        then the known one."""
+
+        known_hashes = [commit.name for commit in known_commits]
+        yielded_hashes = set()
+        pending_hashes = set()
+        known_found = False
 
-class GithubCommitWatcherType(WatcherType):
+        for commit in response:
+            sha = commit['sha']
+            pending_hashes.discard(sha)
+
+            if sha in known_hashes:
+                known_found = True
+                index = known_hashes.index(sha)
+                if not pending_hashes:
+                    # The rest of the history is already known
+                    yield from (c for c in known_commits[index:] if c.name not in yielded_hashes)
+                    return
+                yielded_hashes.add(sha)
+                yield known_commits[index]
+                continue
+
+            commit_date = parse_iso_date(commit['commit']['committer']['date'])
+            yielded_hashes.add(sha)
+            yield Release(sha, commit_date)
+            pending_hashes.update(parent['sha'] for parent in commit.get('parents', [])
+                                  if parent['sha'] not in known_hashes)
+
+        if known_commits and not known_found:
+            logger.warning('No known commit found for %s, the branch may have been rewritten',
+                           self.config)
+
+    def get_graphql_fields(self) -> str:
+        branch = json.dumps(f'refs/heads/{self.config.branch}')
+        return f'ref(qualifiedName: {branch}) {{ target {{ ... on Commit ' \
+            '{ history(first: 100) { nodes { oid committedDate parents(first: 10) ' \
+            '{ nodes { oid } } } } } } }'
+
+    def parse_graphql_repository(self, repository: Dict) -> Sequence[Dict]:
+        if not repository['ref']:
+            return None
+
+        return [
+            {'sha': commit['oid'], 'commit': {'committer': {'date': commit['committedDate']}},
+             'parents': [{'sha': parent['oid']} for parent in commit['parents']['nodes']]}
+            for commit in repository['ref']['target']['history']['nodes']
+        ]
+
+
+class GithubCommitWatcherType(BaseGithubWatcherType):
     """Class to represent the GithubCommitWatcher type of Watcher"""
 
     def __init__(self):
@@ -76,11 +226,14 @@ class GithubCommitWatcherType(WatcherType):
         name = watcher_config.get('name', repo)
 
         config = GithubCommitWatcherConfig(name, repo, branch, commit)
-        config.username = watcher_config.get('username', common_config.github.username)
-        config.password = watcher_config.get('password', common_config.github.password)
-        config.timeout = watcher_config.get('timeout', common_config.github.timeout)
-        config.rate_limit_wait_max = watcher_config.get(
-            'rate_limit_wait_max', common_config.github.rate_limit_wait_max)
+        self._parse_github_config(config, common_config, watcher_config)
+        config.probe = watcher_config.get('probe', common_config.github.probe)
+        config.mode = watcher_config.get('mode', 'history')
+        if config.mode not in MODES:
+            raise ValueError(f'Unknown mode {config.mode} for {name}, expected one of {MODES}')
+        if config.mode != 'history':
+            # The compare API has no GraphQL equivalent
+            config.api = 'rest'
 
         return config
 
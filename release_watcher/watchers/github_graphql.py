@@ -0,0 +1,105 @@
+import logging
+import json
+from typing import Dict, Sequence
+from release_watcher import http_client
+from release_watcher.watchers import github_rate_limit
+from release_watcher.watchers.watcher_models import WatchError
+
+logger = logging.getLogger(__name__)
+
+GRAPHQL_URL = 'https://api.github.com/graphql'
+
+
+def prefetch_watchers(watchers: Sequence):
+    """Fetches the data of many GitHub watchers with a few GraphQL queries
+
+    Watchers are grouped by credentials pool, and each group is split in
+    batches of graphql_batch_size repositories. Each batch is sent as a single
+    query, with one aliased repository field per watcher.
+
+    The data of each repository is converted to the REST format by the
+    watcher, and stored in its prefetched_response. Watchers without data
+    (no credentials, API error, unknown repository...) will use the REST API.
+    """
+
+    watchers_by_credentials = {}
+    for watcher in watchers:
+        if not watcher.config.credentials:
+            logger.warning('The GraphQL API requires credentials, using REST for %s', watcher)
+            continue
+
+        credentials = tuple(watcher.config.credentials)
+        watchers_by_credentials.setdefault(credentials, []).append(watcher)
+
+    for credentials_watchers in watchers_by_credentials.values():
+        batch_size = credentials_watchers[0].config.graphql_batch_size
+        for index in range(0, len(credentials_watchers), batch_size):
+            batch = credentials_watchers[index:index + batch_size]
+            try:
+                _prefetch_batch(batch)
+            except Exception as e:
+                logger.exception('Error running GraphQL query, falling back to REST : %s', e)
+
+
+def get_commit_dates(config, shas: Sequence[str]) -> Dict[str, str]:
+    """Fetches the committer date of many commits of a repository at once"""
+
+    logger.debug('Fetching the date of %d commits with GraphQL', len(shas))
+
+    owner, name = config.repo.split('/', 1)
+    fields = [
+        f'c{index}: object(oid: {json.dumps(sha)}) {{ ... on Commit {{ committedDate }} }}'
+        for index, sha in enumerate(shas)
+    ]
+    query = f'query {{ repository(owner: {json.dumps(owner)}, name: {json.dumps(name)}) ' \
+        f'{{ {" ".join(fields)} }} }}'
+
+    repository = _call_graphql_api(config, query).get('repository') or {}
+
+    dates = {}
+    for index, sha in enumerate(shas):
+        commit = repository.get(f'c{index}')
+        if commit and commit.get('committedDate'):
+            dates[sha] = commit['committedDate']
+    return dates
+
+
+def _prefetch_batch(watchers: Sequence):
+    logger.debug('Fetching %d GitHub repositories with GraphQL', len(watchers))
+
+    fields = []
+    for index, watcher in enumerate(watchers):
+        owner, name = watcher.config.repo.split('/', 1)
+        fields.append(f'r{index}: repository(owner: {json.dumps(owner)}, '
+                      f'name: {json.dumps(name)}) {{ {watcher.get_graphql_fields()} }}')
+    query = f'query {{ {" ".join(fields)} }}'
+
+    data = _call_graphql_api(watchers[0].config, query)
+
+    for index, watcher in enumerate(watchers):
+        repository = data.get(f'r{index}')
+        if not repository:
+            logger.warning('No GraphQL data for %s, falling back to REST', watcher)
+            continue
+
+        watcher.prefetched_response = watcher.parse_graphql_repository(repository)
+
+
+def _call_graphql_api(config, query: str) -> Dict:
+    auth = github_rate_limit.select_credentials(config.credentials, 'graphql')
+    response = http_client.post(GRAPHQL_URL, json={'query': query}, auth=auth,
+                                timeout=config.timeout,
+                                host_limits=config.host_limits)
+    github_rate_limit.update(auth[0], response.headers)
+
+    if response.status_code != 200:
+        logger.debug('Github GraphQL call failed : code = %s, content = %s',
+                     response.status_code, response.content)
+        raise WatchError(f'Github GraphQL call failed : {response}')
+
+    content = json.loads(response.content.decode('utf-8'))
+
+    for error in content.get('errors', []):
+        logger.warning('Github GraphQL error : %s', error.get('message'))
+
+    return content.get('data') or {}
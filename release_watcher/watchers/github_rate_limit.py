@@ -0,0 +1,170 @@
+import itertools
+import logging
+import threading
+import time
+from typing import Dict, Mapping, Sequence, Tuple
+from release_watcher.watchers.watcher_models import Deferred, WatchError
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = ['high', 'normal', 'low']
+
+# Budgets by (username, resource), username is None for anonymous calls
+BUDGETS = {}
+
+_LOCK = threading.Lock()
+_ROTATION = itertools.count()
+
+
+class RateLimitBudget:
+    """The remaining requests of a GitHub rate limit, shared by all the watchers
+
+    It's updated with the X-RateLimit-* headers of each response, and each
+    request sent is counted in advance, so that concurrent watchers don't
+    spend the same requests."""
+
+    limit: int = None
+    remaining: int = None
+    reset: float = None
+    next_request: float = 0
+
+    def __init__(self, limit: int, remaining: int, reset: float):
+        self.limit = limit
+        self.remaining = remaining
+        self.reset = reset
+
+    def update(self, limit: int, remaining: int, reset: float):
+        """Updates the budget with the headers of a response
+
+        Responses can be received out of order : in the same window,
+        only a lower remaining count is taken into account, and the
+        responses of a previous window are ignored."""
+
+        if reset < self.reset or (reset == self.reset and remaining >= self.remaining):
+            return
+        if reset > self.reset:
+            self.next_request = 0
+
+        self.limit = limit
+        self.remaining = remaining
+        self.reset = reset
+
+    def reserve(self, config) -> float:
+        """Counts a request, and returns the number of seconds to wait before sending it
+
+        Above the reserve, requests are sent right away. Under it, low priority
+        watchers are deferred, and the requests of normal priority watchers are
+        spread evenly until the reset, so that the budget lasts until the end
+        of the window. High priority watchers are never slowed down."""
+
+        now = time.time()
+        if now >= self.reset:
+            # New window, the limit is known again after the first response
+            return 0
+
+        interval = 0
+        if self.remaining <= 0:
+            wait = self.reset - now
+        elif self.remaining > config.rate_limit_reserve or config.priority == 'high':
+            self.remaining -= 1
+            return 0
+        elif config.priority == 'low':
+            raise Deferred(f'GitHub rate limit almost exhausted ({self.remaining} left)')
+        else:
+            interval = (self.reset - now) / self.remaining
+            wait = max(0, self.next_request - now)
+
+        if wait > config.rate_limit_wait_max:
+            raise WatchError(f'Github rate limit almost exhausted ({self.remaining} left), '
+                             f'and the next request is too far ({wait:.0f}s > '
+                             f'{config.rate_limit_wait_max}s)')
+
+        if self.remaining > 0:
+            self.remaining -= 1
+            self.next_request = now + wait + interval
+        return wait
+
+    def __repr__(self):
+        return f'RateLimitBudget({self.remaining}/{self.limit}, ' \
+            f'reset in {self.reset - time.time():.0f} s)'
+
+
+def select_credentials(credentials: Sequence[Tuple[str, str]],
+                       resource: str = 'core') -> Tuple[str, str]:
+    """Selects the credentials of a pool with the most requests left
+
+    Credentials whose budget is unknown yet are used first. Ties are broken
+    in turn, so that requests are spread over the whole pool.
+    Returns None for anonymous calls."""
+
+    if not credentials:
+        return None
+    if len(credentials) == 1:
+        return credentials[0]
+
+    with _LOCK:
+        start = next(_ROTATION) % len(credentials)
+        rotated = list(credentials[start:]) + list(credentials[:start])
+        return max(rotated, key=lambda c: _get_remaining(c[0], resource))
+
+
+def has_budget(credentials: Sequence[Tuple[str, str]], resource: str = 'core') -> bool:
+    """Returns True if some credentials of a pool may still have requests left"""
+
+    with _LOCK:
+        return any(_get_remaining(username, resource) > 0
+                   for username, _ in credentials or [])
+
+
+def acquire(config, username: str, resource: str = 'core'):
+    """Waits until a request can be sent to GitHub within the rate limit of a user
+
+    Raises Deferred for low priority watchers when the budget runs low,
+    and WatchError if the wait would exceed rate_limit_wait_max."""
+
+    with _LOCK:
+        budget = BUDGETS.get((username, resource))
+        if not budget:
+            # Unknown until the first response
+            return
+        wait = budget.reserve(config)
+
+    if wait > 0:
+        logger.debug('Pacing GitHub requests, waiting %.1f s (%s)', wait, budget)
+        time.sleep(wait)
+
+
+def update(username: str, headers: Mapping[str, str]):
+    """Updates the budget of a user with the X-RateLimit-* headers of a response"""
+
+    if 'X-RateLimit-Remaining' not in headers:
+        return
+
+    try:
+        limit = int(headers.get('X-RateLimit-Limit'))
+        remaining = int(headers.get('X-RateLimit-Remaining'))
+        reset = int(headers.get('X-RateLimit-Reset'))
+    except (TypeError, ValueError):
+        logger.debug('Invalid rate limit headers : %s', headers)
+        return
+
+    key = (username, headers.get('X-RateLimit-Resource', 'core'))
+    with _LOCK:
+        if key in BUDGETS:
+            BUDGETS[key].update(limit, remaining, reset)
+        else:
+            BUDGETS[key] = RateLimitBudget(limit, remaining, reset)
+
+
+def get_budgets() -> Dict[Tuple[str, str], RateLimitBudget]:
+    """Returns the known budgets, by (username, resource)"""
+
+    with _LOCK:
+        return dict(BUDGETS)
+
+
+def _get_remaining(username: str, resource: str) -> float:
+    budget = BUDGETS.get((username, resource))
+    if not budget or time.time() >= budget.reset:
+        return float('inf')
+    return budget.remaining
@@ -1,11 +1,11 @@
 import logging
 from typing import Dict, Sequence
-import re
-import dateutil.parser
 from release_watcher.config_models import CommonConfig
-from release_watcher.watchers.watcher_models import Release, WatchResult
-from release_watcher.watchers.watcher_manager import WatcherType
-from release_watcher.watchers.base_github_watcher import BaseGithubWatcher, BaseGithubConfig
+from release_watcher.watchers.watcher_models import Release, WatchError, WatchResult
+from release_watcher.watchers.date_parser import parse_iso_date
+from release_watcher.watchers.release_filter import ReleaseFilter
+from release_watcher.watchers.base_github_watcher import \
+    BaseGithubWatcher, BaseGithubConfig, BaseGithubWatcherType
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +18,7 @@ class GithubReleaseWatcherConfig(BaseGithubConfig):
     release: str = None
     includes: Sequence[str] = []
     excludes: Sequence[str] = []
+    release_filter: ReleaseFilter = None
 
     def __init__(self, name: str, repo: str, release: str,
                  includes: Sequence[str], excludes: Sequence[str]):
@@ -38,28 +39,22 @@ class GithubReleaseWatcher(BaseGithubWatcher):
 
     def _do_watch(self) -> WatchResult:
         logger.debug('Watching Github release %s', self.config)
-        response = self._call_github_api('releases')
+        # Prefetched GraphQL data is already available at no cost
+        if self.config.probe and self.prefetched_response is None:
+            result = self._probe_latest_release()
+            if result:
+                return result
+
+        response = self._get_github_items('releases', lambda r: r['tag_name'])
         current_release_name = self.config.release
         current_release = None
         missed_releases = []
 
-        for include_re in self.config.includes:
-            response = [
-                release for release in response
-                if re.compile(include_re).match(release['tag_name'])
-            ]
-
-        for exclude_re in self.config.excludes:
-            response = [
-                release for release in response
-                if not re.compile(exclude_re).match(release['tag_name'])
-            ]
-
-        for release in response:
+        for release in self.config.release_filter.filter(response, lambda r: r['tag_name']):
             new_release_name = release['tag_name']
             logger.debug(' - %s', new_release_name)
 
-            new_release_date = dateutil.parser.parse(release['published_at'])
+            new_release_date = parse_iso_date(release['published_at'])
             new_release = Release(new_release_name, new_release_date)
 
             if new_release_name == current_release_name:
@@ -75,8 +70,42 @@ class GithubReleaseWatcher(BaseGithubWatcher):
         logger.debug('Missed releases : %s', missed_releases)
         return WatchResult(self.config, current_release, missed_releases)
 
+    def _probe_latest_release(self) -> WatchResult:
+        """Checks if the latest release of the repository is the current one
+
+        The latest release is a single small object, cheaper than the full
+        listing. Returns None if it's not the current release."""
+
+        try:
+            latest_release = self._call_github_api('releases/latest')
+        except WatchError as e:
+            logger.debug('Error fetching the latest release, listing all releases : %s', e)
+            return None
+
+        latest_release_name = latest_release['tag_name']
+        if latest_release_name != self.config.release \
+                or not self.config.release_filter.matches(latest_release_name):
+            logger.debug('Latest release %s is not the current one', latest_release_name)
+            return None
+
+        logger.debug('Current release %s is the latest one', latest_release_name)
+        current_release = Release(latest_release_name,
+                                  parse_iso_date(latest_release['published_at']))
+        return WatchResult(self.config, current_release, [])
+
+    def get_graphql_fields(self) -> str:
+        return 'releases(first: 100, orderBy: {field: CREATED_AT, direction: DESC}) ' \
+            '{ nodes { tagName publishedAt } }'
+
+    def parse_graphql_repository(self, repository: Dict) -> Sequence[Dict]:
+        return [
+            {'tag_name': release['tagName'], 'published_at': release['publishedAt']}
+            for release in repository['releases']['nodes']
+            if release['publishedAt']
+        ]
+
 
-class GithubReleaseWatcherType(WatcherType):
+class GithubReleaseWatcherType(BaseGithubWatcherType):
     """Class to represent the GithubReleaseWatcher type of Watcher"""
 
     def __init__(self):
@@ -92,12 +121,10 @@ class GithubReleaseWatcherType(WatcherType):
         name = watcher_config.get('name', repo)
 
         config = GithubReleaseWatcherConfig(name, repo, release, includes, excludes)
+        config.release_filter = ReleaseFilter(includes, excludes)
 
-        config.username = watcher_config.get('username', common_config.github.username)
-        config.password = watcher_config.get('password', common_config.github.password)
-        config.timeout = watcher_config.get('timeout', common_config.github.timeout)
-        config.rate_limit_wait_max = watcher_config.get(
-            'rate_limit_wait_max', common_config.github.rate_limit_wait_max)
+        self._parse_github_config(config, common_config, watcher_config)
+        config.probe = watcher_config.get('probe', common_config.github.probe)
 
         return config
 
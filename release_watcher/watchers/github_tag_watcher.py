@@ -1,16 +1,20 @@
 import logging
-from typing import Sequence
-import re
-import dateutil.parser
+from typing import Dict, Sequence
+from release_watcher import cache_manager
 from release_watcher.config_models import CommonConfig
+from release_watcher.watchers import github_graphql
 from release_watcher.watchers.watcher_models import Release, WatchResult
-from release_watcher.watchers.watcher_manager import WatcherType
-from release_watcher.watchers.base_github_watcher import BaseGithubWatcher, BaseGithubConfig
+from release_watcher.watchers.date_parser import parse_iso_date
+from release_watcher.watchers.release_filter import ReleaseFilter
+from release_watcher.watchers.base_github_watcher import \
+    BaseGithubWatcher, BaseGithubConfig, BaseGithubWatcherType
 
 logger = logging.getLogger(__name__)
 
 WATCHER_TYPE_NAME = 'github_tag'
 
+COMMIT_DATE_CACHE_NAME = 'github_commit_dates'
+
 
 class GithubTagWatcherConfig(BaseGithubConfig):
     """Class to store the configuration for a GithubTagWatcher"""
@@ -18,6 +22,8 @@ class GithubTagWatcherConfig(BaseGithubConfig):
     tag: str = None
     includes: Sequence[str] = []
     excludes: Sequence[str] = []
+    release_filter: ReleaseFilter = None
+    cache_size: int = None
 
     def __init__(self, name: str, repo: str, tag: str,
                  includes: Sequence[str], excludes: Sequence[str]):
@@ -33,37 +39,37 @@ class GithubTagWatcherConfig(BaseGithubConfig):
 class GithubTagWatcher(BaseGithubWatcher):
     """Implementation of a Watcher that checks for new tags in a GitHub repository"""
 
+    commit_date_cache: cache_manager.PersistentLruCache = None
+
     def __init__(self, config: GithubTagWatcherConfig):
         super().__init__(config)
+        self.commit_date_cache = cache_manager.get_cache(COMMIT_DATE_CACHE_NAME,
+                                                         config.cache_size)
 
     def _do_watch(self) -> WatchResult:
         logger.debug('Watching Github tag %s', self.config)
-        response = self._call_github_api('tags')
+        # Tags are listed by name, so later pages may still hold new tags
+        response = self._get_github_items('tags', lambda t: t['name'], newest_first=False)
 
         current_tag_name = self.config.tag
         current_tag = None
         missed_tags = []
 
-        for include_re in self.config.includes:
-            response = [
-                tag for tag in response
-                if re.compile(include_re).match(tag['name'])
-            ]
+        # Only the tags up to the current one are needed
+        dated_tags = []
+        for tag in self.config.release_filter.filter(response, lambda t: t['name']):
+            dated_tags.append(tag)
+            if tag['name'] == current_tag_name:
+                break
 
-        for exclude_re in self.config.excludes:
-            response = [
-                tag for tag in response
-                if not re.compile(exclude_re).match(tag['name'])
-            ]
+        tag_dates = self._get_tag_date_strings(dated_tags)
 
-        for tag in response:
+        for tag in dated_tags:
             new_tag_name = tag['name']
             logger.debug(' - %s', new_tag_name)
 
-            commit_url = tag['commit']['url']
-            commit = self._call_github_api(commit_url)
-            new_tag_date_string = commit['commit']['committer']['date']
-            new_tag_date = dateutil.parser.parse(new_tag_date_string)
+            new_tag_date_string = tag_dates[tag['commit']['sha']]
+            new_tag_date = parse_iso_date(new_tag_date_string)
             new_tag = Release(new_tag_name, new_tag_date)
 
             if new_tag_name == current_tag_name:
@@ -79,8 +85,66 @@ class GithubTagWatcher(BaseGithubWatcher):
         logger.debug('Missed tags : %s', missed_tags)
         return WatchResult(self.config, current_tag, missed_tags)
 
-
-class GithubTagWatcherType(WatcherType):
+    def _get_tag_date_strings(self, tags: Sequence[Dict]) -> Dict[str, str]:
+        """Returns the commit date of each tag, indexed by commit sha
+
+        Commits are immutable, so their dates are cached. Unknown dates are
+        fetched with GraphQL queries of graphql_batch_size commits if credentials
+        are available, or with one REST call per commit otherwise."""
+
+        dates = {}
+        missing_shas = []
+        for tag in tags:
+            sha = tag['commit']['sha']
+            if 'date' in tag['commit']:
+                dates[sha] = tag['commit']['date']
+            elif sha in self.commit_date_cache:
+                dates[sha] = self.commit_date_cache.get(sha)
+            elif sha not in missing_shas:
+                missing_shas.append(sha)
+
+        if missing_shas and self.config.credentials:
+            batch_size = self.config.graphql_batch_size
+            for index in range(0, len(missing_shas), batch_size):
+                batch = missing_shas[index:index + batch_size]
+                try:
+                    dates.update(github_graphql.get_commit_dates(self.config, batch))
+                except Exception as e:
+                    logger.warning('Error fetching commit dates with GraphQL : %s', e)
+
+        for tag in tags:
+            sha = tag['commit']['sha']
+            if sha not in dates:
+                commit = self._call_github_api(tag['commit']['url'])
+                dates[sha] = commit['commit']['committer']['date']
+
+        for sha, date in dates.items():
+            self.commit_date_cache.put(sha, date)
+
+        return dates
+
+    def get_graphql_fields(self) -> str:
+        commit_fields = '... on Commit { oid committedDate }'
+        return 'refs(refPrefix: "refs/tags/", first: 100, ' \
+            'orderBy: {field: TAG_COMMIT_DATE, direction: DESC}) ' \
+            f'{{ nodes {{ name target {{ {commit_fields} ' \
+            f'... on Tag {{ target {{ {commit_fields} }} }} }} }} }}'
+
+    def parse_graphql_repository(self, repository: Dict) -> Sequence[Dict]:
+        tags = []
+        for ref in repository['refs']['nodes']:
+            # Annotated tags point to a Tag object, that points to the commit
+            commit = ref['target'].get('target', ref['target'])
+            if 'committedDate' not in commit:
+                continue
+            tags.append({
+                'name': ref['name'],
+                'commit': {'sha': commit['oid'], 'date': commit['committedDate']}
+            })
+        return tags
+
+
+class GithubTagWatcherType(BaseGithubWatcherType):
     """Class to represent the GithubTagWatcher type of Watcher"""
 
     def __init__(self):
@@ -95,11 +159,9 @@ class GithubTagWatcherType(WatcherType):
         name = watcher_config.get('name', repo)
 
         config = GithubTagWatcherConfig(name, repo, tag, includes, excludes)
-        config.username = watcher_config.get('username', common_config.github.username)
-        config.password = watcher_config.get('password', common_config.github.password)
-        config.timeout = watcher_config.get('timeout', common_config.github.timeout)
-        config.rate_limit_wait_max = watcher_config.get(
-            'rate_limit_wait_max', common_config.github.rate_limit_wait_max)
+        config.release_filter = ReleaseFilter(includes, excludes)
+        self._parse_github_config(config, common_config, watcher_config)
+        config.cache_size = common_config.github.cache_size
 
         return config
 
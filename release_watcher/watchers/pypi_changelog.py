@@ -0,0 +1,55 @@
+import logging
+import xmlrpc.client
+from typing import Dict
+from packaging.utils import canonicalize_name
+from release_watcher import http_client
+from release_watcher.watchers.watcher_models import WatchError
+
+logger = logging.getLogger(__name__)
+
+PYPI_XMLRPC_URL = 'https://pypi.org/pypi'
+
+
+def get_last_serial(config) -> int:
+    """Returns the serial of the last event on PyPI"""
+
+    return _call_xmlrpc_api(config, 'changelog_last_serial')
+
+
+def get_changed_packages(config, since_serial: int, last_serial: int) -> Dict[str, int]:
+    """Returns the packages changed since a serial, with the serial of their last event
+
+    PyPI returns a limited number of events per call, so events are read
+    until last_serial. Returns None if they couldn't all be read.
+
+    Package names are normalized (see canonicalize_name)."""
+
+    changed_packages = {}
+    serial = since_serial
+    while serial < last_serial:
+        events = _call_xmlrpc_api(config, 'changelog_since_serial', serial)
+        logger.debug('%d PyPI events since serial %d', len(events), serial)
+        if not events:
+            logger.warning('PyPI changelog stopped at serial %d, before %d', serial, last_serial)
+            return None
+
+        for name, _, _, _, event_serial in events:
+            package = canonicalize_name(name)
+            changed_packages[package] = max(event_serial, changed_packages.get(package, 0))
+            serial = max(serial, event_serial)
+
+    return changed_packages
+
+
+def _call_xmlrpc_api(config, method: str, *params):
+    body = xmlrpc.client.dumps(params, method)
+    response = http_client.post(PYPI_XMLRPC_URL, data=body.encode('utf-8'),
+                                headers={'Content-Type': 'text/xml'},
+                                timeout=config.timeout,
+                                host_limits=config.host_limits)
+
+    if response.status_code != 200:
+        raise WatchError(f'PyPI XML-RPC call {method} failed, '
+                         f'response code {response.status_code}')
+
+    return xmlrpc.client.loads(response.content)[0][0]
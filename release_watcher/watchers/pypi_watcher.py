@@ -1,18 +1,27 @@
 import logging
-from typing import Dict, Sequence
+from typing import Dict, Iterable, Sequence
 import json
-import re
 import datetime
-import dateutil.parser
 import requests
-from release_watcher.config_models import CommonConfig
-from release_watcher.watchers.watcher_models import Release, WatchError, WatchResult
+from packaging.utils import InvalidSdistFilename, InvalidWheelFilename, \
+    canonicalize_name, parse_sdist_filename, parse_wheel_filename
+from packaging.version import InvalidVersion, Version
+from release_watcher import http_client, http_validators
+from release_watcher.config_models import CommonConfig, HostLimitsConfig
+from release_watcher.watchers.watcher_models import NotModified, Release, WatchError, \
+    WatchResult
 from release_watcher.watchers.watcher_manager import Watcher, WatcherConfig, WatcherType
+from release_watcher.watchers import pypi_changelog, version_ordering
+from release_watcher.watchers.date_parser import parse_iso_date
+from release_watcher.watchers.release_filter import ReleaseFilter
 
 logger = logging.getLogger(__name__)
 
 WATCHER_TYPE_NAME = 'pypi'
 
+SIMPLE_JSON_CONTENT_TYPE = 'application/vnd.pypi.simple.v1+json'
+PYPI_BACKENDS = ['json', 'simple']
+
 
 class PyPIWatcherConfig(WatcherConfig):
     """Class to store the configuration for a PyPIWatcher"""
@@ -21,7 +30,12 @@ class PyPIWatcherConfig(WatcherConfig):
     version: str = None
     includes: Sequence[str] = []
     excludes: Sequence[str] = []
+    release_filter: ReleaseFilter = None
     timeout: float
+    ordering: str = 'date'
+    backend: str = 'json'
+    changelog: bool = False
+    host_limits: HostLimitsConfig = None
 
     def __init__(self, name: str, package: str, version: str,
                  includes: Sequence[str], excludes: Sequence[str], timeout: float):
@@ -39,29 +53,50 @@ class PyPIWatcherConfig(WatcherConfig):
 class PyPIWatcher(Watcher):
     """Implementation of a Watcher that checks for new releases of a PyPI package"""
 
+    last_serial: str = None
+    pending_serial: str = None
+    changelog_serial: int = None
+    pending_changelog_serial: int = None
+    skip_unchanged: bool = False
+
     def __init__(self, config: PyPIWatcherConfig):
         super().__init__(config)
 
     def _do_watch(self) -> WatchResult:
         logger.debug('Watching PyPI %s', self.config)
-        pypi_releases = self._get_all_releases_from_pypi()
-        pypi_release_names = pypi_releases.keys()
-
-        for ire in self.config.includes:
-            pypi_release_names = [
-                r for r in pypi_release_names if re.compile(ire).match(r)
-            ]
-
-        for ere in self.config.excludes:
-            pypi_release_names = [
-                r for r in pypi_release_names if not re.compile(ere).match(r)
-            ]
-
+        if self.skip_unchanged:
+            logger.debug('%s unchanged in the PyPI changelog', self.config.package)
+            self._mark_up_to_date()
+            raise NotModified()
+
+        content = self._get_pypi_content()
+        pypi_releases = self._get_upload_times(content)
+        # Releases without any file can't be dated
+        pypi_release_names = [
+            r for r in self.config.release_filter.filter(pypi_releases) if pypi_releases[r]
+        ]
+
+        if self.config.ordering == 'date':
+            result = self._watch_by_date(pypi_releases, pypi_release_names)
+        else:
+            result = self._watch_by_version(pypi_releases, pypi_release_names)
+
+        # Only a successful watch can be skipped when the serial doesn't change
+        self.last_serial = self.pending_serial
+        self._mark_up_to_date()
+        return result
+
+    def _mark_up_to_date(self):
+        # The changes of the package are known up to the global serial read before the run
+        if self.pending_changelog_serial:
+            self.changelog_serial = self.pending_changelog_serial
+
+    def _watch_by_date(self, pypi_releases: Dict,
+                       pypi_release_names: Iterable[str]) -> WatchResult:
         releases = []
         for release in pypi_release_names:
-            if pypi_releases[release]:
-                release_date = self._get_release_date(pypi_releases[release])
-                releases.append(Release(release, release_date))
+            release_date = self._get_release_date(pypi_releases[release])
+            releases.append(Release(release, release_date))
 
         # Sort with most recent first
         releases.sort(key=lambda r: r.release_date, reverse=True)
@@ -84,25 +119,120 @@ class PyPIWatcher(Watcher):
         logger.debug('Missed releases : %s', missed_releases)
         return WatchResult(self.config, current_release, missed_releases)
 
-    def _get_all_releases_from_pypi(self) -> Dict:
+    def _watch_by_version(self, pypi_releases: Dict,
+                          pypi_release_names: Iterable[str]) -> WatchResult:
+        # Only the releases with a greater version than the current one need a date
+        current_version = self.config.version
+        current_found, newer_versions = version_ordering.select_newer_versions(
+            self.config.ordering, pypi_release_names, current_version)
+
+        missed_releases = [
+            Release(version, self._get_release_date(pypi_releases[version]))
+            for version in newer_versions
+        ]
+
+        current_release = None
+        if current_found:
+            current_release = Release(
+                current_version, self._get_release_date(pypi_releases[current_version]))
+        else:
+            logger.warning('Current release %s not found !', current_version)
+
+        logger.debug('Missed releases : %s', missed_releases)
+        return WatchResult(self.config, current_release, missed_releases)
+
+    def _get_pypi_content(self) -> Dict:
         api_response = self._call_pypi_api()
 
-        if api_response.status_code == 200:
-            content = json.loads(api_response.content.decode('utf-8'))
-            return content['releases']
+        if api_response.status_code == 304:
+            self._mark_up_to_date()
+            raise NotModified()
 
-        raise WatchError(f'PyPI api call failed, response code {api_response.status_code}')
+        if api_response.status_code != 200:
+            raise WatchError(f'PyPI api call failed, response code {api_response.status_code}')
 
-    def _call_pypi_api(self) -> requests.Response:
-        pypi_package_url = f'https://pypi.org/pypi/{self.config.package}/json'
-        headers = {'Content-Type': 'application/json'}
+        self._store_validators(api_response.url, api_response)
+
+        # The serial of a project changes with every change of its releases
+        serial = api_response.headers.get('X-PyPI-Last-Serial')
+        if serial and serial == self.last_serial and self.last_result:
+            logger.debug('Serial %s of %s unchanged', serial, self.config.package)
+            self._mark_up_to_date()
+            raise NotModified()
+        self.pending_serial = serial
 
-        response = requests.get(pypi_package_url, headers=headers, timeout=self.config.timeout)
+        return json.loads(api_response.content)
+
+    def _get_upload_times(self, content: Dict) -> Dict[str, str]:
+        """Returns the earliest upload time of the files of each release, by version
+
+        The upload time is None for a release without any file."""
+
+        if self.config.backend == 'simple':
+            return self._get_upload_times_from_simple(content)
+        return self._get_upload_times_from_json(content)
+
+    def _call_pypi_api(self) -> requests.Response:
+        if self.config.backend == 'simple':
+            pypi_package_url = f'https://pypi.org/simple/{self.config.package}/'
+            headers = {'Accept': SIMPLE_JSON_CONTENT_TYPE}
+        else:
+            pypi_package_url = f'https://pypi.org/pypi/{self.config.package}/json'
+            headers = {'Content-Type': 'application/json'}
+
+        if self.last_result:
+            headers = http_validators.add_validator_headers(pypi_package_url, headers)
+
+        response = http_client.get(pypi_package_url, headers=headers,
+                                   timeout=self.config.timeout,
+                                   host_limits=self.config.host_limits)
         return response
 
-    def _get_release_date(self, items: Sequence) -> datetime:
-        dates = [dateutil.parser.parse(i['upload_time']) for i in items]
-        return min(dates)
+    def _get_upload_times_from_json(self, content: Dict) -> Dict[str, str]:
+        # upload_time values share the same ISO format, so the earliest one sorts first
+        return {
+            version: min((f['upload_time'] for f in files), default=None)
+            for version, files in content['releases'].items()
+        }
+
+    def _get_upload_times_from_simple(self, content: Dict) -> Dict[str, str]:
+        # Files are not linked to their version, which has to be read from their name.
+        # Versions are normalized in file names, but not in the versions list.
+        versions = {}
+        for version in content.get('versions', []):
+            try:
+                versions[Version(version)] = version
+            except InvalidVersion:
+                versions[version] = version
+
+        upload_times = dict.fromkeys(versions.values())
+        for pypi_file in content['files']:
+            file_version = _get_file_version(pypi_file['filename'])
+            upload_time = pypi_file.get('upload-time')
+            if file_version is None or not upload_time:
+                continue
+
+            version = versions.get(file_version, str(file_version))
+            if not upload_times.get(version) or upload_time < upload_times[version]:
+                upload_times[version] = upload_time
+
+        return upload_times
+
+    def _get_release_date(self, upload_time: str) -> datetime:
+        return parse_iso_date(upload_time)
+
+
+def _get_file_version(filename: str) -> Version:
+    try:
+        if filename.endswith('.whl'):
+            return parse_wheel_filename(filename)[1]
+        if filename.endswith(('.tar.gz', '.zip')):
+            return parse_sdist_filename(filename)[1]
+    except (InvalidWheelFilename, InvalidSdistFilename, InvalidVersion):
+        pass
+
+    logger.debug('Version of file %s unknown, ignoring it', filename)
+    return None
 
 
 class PyPIWatcherType(WatcherType):
@@ -120,7 +250,60 @@ class PyPIWatcherType(WatcherType):
 
         name = watcher_config.get('name', f'{package}:{version}')
 
-        return PyPIWatcherConfig(name, package, version, includes, excludes, timeout)
+        config = PyPIWatcherConfig(name, package, version, includes, excludes, timeout)
+        config.release_filter = ReleaseFilter(includes, excludes)
+        config.host_limits = common_config.pypi.host_limits
+        config.interval = self._parse_interval(name, watcher_config, common_config.pypi.interval)
+        config.ordering = watcher_config.get('ordering', 'date')
+        if config.ordering not in version_ordering.ORDERINGS:
+            raise ValueError(f'Unknown ordering {config.ordering} for {name}, '
+                             f'expected one of {version_ordering.ORDERINGS}')
+        config.changelog = common_config.pypi.changelog
+        config.backend = watcher_config.get('backend', common_config.pypi.backend)
+        if config.backend not in PYPI_BACKENDS:
+            raise ValueError(f'Unknown backend {config.backend} for {name}, '
+                             f'expected one of {PYPI_BACKENDS}')
+
+        return config
+
+    def prepare_watchers(self, watchers: Sequence[PyPIWatcher]):
+        """Skips the watchers of packages that didn't change since their last run
+
+        With the changelog setting, the PyPI changelog is read once for all
+        the watchers, instead of fetching every package."""
+
+        for watcher in watchers:
+            watcher.skip_unchanged = False
+            watcher.pending_changelog_serial = None
+
+        changelog_watchers = [w for w in watchers if w.config.changelog]
+        if not changelog_watchers:
+            return
+
+        config = changelog_watchers[0].config
+        last_serial = pypi_changelog.get_last_serial(config)
+
+        known_serials = [w.changelog_serial for w in changelog_watchers
+                         if w.changelog_serial and w.last_result]
+        changed_packages = None
+        if known_serials:
+            changed_packages = pypi_changelog.get_changed_packages(
+                config, min(known_serials), last_serial)
+
+        skipped = 0
+        for watcher in changelog_watchers:
+            watcher.pending_changelog_serial = last_serial
+            if changed_packages is None or not watcher.changelog_serial \
+                    or not watcher.last_result:
+                continue
+
+            package = canonicalize_name(watcher.config.package)
+            if changed_packages.get(package, 0) <= watcher.changelog_serial:
+                watcher.skip_unchanged = True
+                skipped += 1
+
+        logger.info('%d PyPI watchers out of %d unchanged since their last run',
+                    skipped, len(changelog_watchers))
 
     def create_watcher(self, watcher_config: PyPIWatcherConfig) -> PyPIWatcher:
         return PyPIWatcher(watcher_config)
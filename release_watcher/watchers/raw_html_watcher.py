@@ -1,10 +1,11 @@
 import logging
 from typing import Dict, Sequence
-import requests
 from bs4 import BeautifulSoup, Tag
 import dateutil.parser
-from release_watcher.config_models import CommonConfig
-from release_watcher.watchers.watcher_models import Release, WatchError, WatchResult
+from release_watcher import http_client, http_validators
+from release_watcher.config_models import CommonConfig, HostLimitsConfig
+from release_watcher.watchers.watcher_models import NotModified, Release, WatchError, \
+    WatchResult
 from release_watcher.watchers.watcher_manager import Watcher, WatcherConfig, WatcherType
 
 logger = logging.getLogger(__name__)
@@ -26,6 +27,7 @@ class RawHtmlWatcherConfig(WatcherConfig):
     basic_auth: Dict = None
     current_id: str = None
     timeout: float
+    host_limits: HostLimitsConfig = None
 
     def __init__(self, name: str, page_url: str, current_id: str):
         super().__init__(WATCHER_TYPE_NAME, name)
@@ -78,9 +80,20 @@ class RawHtmlWatcher(Watcher):
             auth = (self.config.basic_auth['username'], self.config.basic_auth['password'])
         else:
             auth = None
-        response = requests.get(self.config.page_url, auth=auth, timeout=self.config.timeout)
+
+        headers = {}
+        if self.last_result:
+            headers = http_validators.add_validator_headers(self.config.page_url, headers, auth)
+
+        response = http_client.get(self.config.page_url, headers=headers, auth=auth,
+                                   timeout=self.config.timeout,
+                                   host_limits=self.config.host_limits)
+
+        if response.status_code == 304:
+            raise NotModified()
 
         if response.status_code == 200:
+            self._store_validators(self.config.page_url, response, auth)
             response_content = response.content.decode('utf-8')
             soup = BeautifulSoup(response_content, 'html.parser')
 
@@ -150,6 +163,9 @@ class RawHtmlWatcherType(WatcherType):
         if 'basic_auth' in watcher_config:
             config.basic_auth = watcher_config['basic_auth']
         config.timeout = watcher_config.get('timeout', common_config.raw_html.timeout)
+        config.host_limits = common_config.raw_html.host_limits
+        config.interval = self._parse_interval(name, watcher_config,
+                                               common_config.raw_html.interval)
 
         return config
 
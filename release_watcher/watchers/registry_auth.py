@@ -0,0 +1,177 @@
+import logging
+import json
+import threading
+import time
+from typing import Dict, Sequence
+import www_authenticate
+from release_watcher import http_client
+from release_watcher.watchers.watcher_models import WatchError
+
+logger = logging.getLogger(__name__)
+
+# Lifetime of a token when the registry doesn't send expires_in (see the docker token spec)
+DEFAULT_EXPIRES_IN = 60
+# Tokens are refreshed when less than this share of their lifetime remains
+REFRESH_RATIO = 0.2
+# Number of scopes requested at most in a single token, to keep URLs short
+MAX_SCOPES_PER_TOKEN = 50
+
+# Bearer challenge (realm, service) of each registry, None if it doesn't require a token
+CHALLENGES = {}
+# Tokens by (realm, service, scope)
+TOKENS = {}
+
+_LOCK = threading.Lock()
+
+
+class RegistryToken:
+    """A bearer token issued by a registry authorization service"""
+
+    token: str = None
+    expires_at: float = None
+    refresh_at: float = None
+
+    def __init__(self, token: str, expires_in: int):
+        now = time.monotonic()
+        self.token = token
+        self.expires_at = now + expires_in
+        self.refresh_at = now + expires_in * (1 - REFRESH_RATIO)
+
+    def is_fresh(self) -> bool:
+        """Returns True if the token can be used without refreshing it"""
+        return time.monotonic() < self.refresh_at
+
+    def __repr__(self):
+        return f'RegistryToken({self.expires_at - time.monotonic():.0f} s left)'
+
+
+def get_token(config) -> str:
+    """Returns a token to pull the image of a docker watcher
+
+    Tokens are shared by all the watchers, and refreshed before they expire.
+    Returns None if the registry doesn't require a token, or if its
+    authorization service isn't known yet (see authenticate)."""
+
+    with _LOCK:
+        if config.repo not in CHALLENGES:
+            return None
+        challenge = CHALLENGES[config.repo]
+
+    if not challenge:
+        return None
+
+    scope = _get_scope(config)
+    key = (*challenge, scope)
+    with _LOCK:
+        registry_token = TOKENS.get(key)
+
+    if not registry_token or not registry_token.is_fresh():
+        registry_token = _fetch_token(config, challenge, [scope])
+
+    return registry_token.token
+
+
+def authenticate(config, authenticate_header: str) -> str:
+    """Handles a 401 response of a registry, and returns a new token
+
+    The authorization service of the registry is remembered, so that other
+    watchers of the same registry don't need to be rejected first."""
+
+    challenge, scope = _parse_challenge(authenticate_header)
+    with _LOCK:
+        CHALLENGES[config.repo] = challenge
+
+    return _fetch_token(config, challenge, [scope or _get_scope(config)]).token
+
+
+def prefetch_tokens(configs: Sequence):
+    """Fetches the tokens of many docker watchers at once
+
+    The authorization service of each registry is discovered once, and a
+    single token is requested for the scopes of up to MAX_SCOPES_PER_TOKEN
+    images of the same registry."""
+
+    configs_by_repo = {}
+    for config in configs:
+        configs_by_repo.setdefault(config.repo, []).append(config)
+
+    for repo, repo_configs in configs_by_repo.items():
+        try:
+            challenge = _get_challenge(repo_configs[0])
+            if not challenge:
+                continue
+
+            with _LOCK:
+                missing_configs = {
+                    _get_scope(config): config for config in repo_configs
+                    if not _is_fresh(TOKENS.get((*challenge, _get_scope(config))))
+                }
+
+            scopes = list(missing_configs)
+            for index in range(0, len(scopes), MAX_SCOPES_PER_TOKEN):
+                _fetch_token(repo_configs[0], challenge,
+                             scopes[index:index + MAX_SCOPES_PER_TOKEN])
+        except Exception as e:
+            logger.exception('Error fetching the tokens for %s : %s', repo, e)
+
+
+def _get_challenge(config) -> Dict:
+    with _LOCK:
+        if config.repo in CHALLENGES:
+            return CHALLENGES[config.repo]
+
+    # The API version check returns the challenge of the registry, if any
+    response = http_client.get(f'https://{config.repo}/v2/',
+                               timeout=config.timeout,
+                               host_limits=config.host_limits)
+
+    challenge = None
+    if response.status_code == 401 and 'Www-Authenticate' in response.headers:
+        challenge, _ = _parse_challenge(response.headers['Www-Authenticate'])
+
+    logger.debug('Authorization service of %s : %s', config.repo, challenge)
+    with _LOCK:
+        CHALLENGES[config.repo] = challenge
+    return challenge
+
+
+def _parse_challenge(authenticate_header: str):
+    parsed_header = www_authenticate.parse(authenticate_header)
+    if 'bearer' not in parsed_header:
+        raise WatchError(f'Unsupported authentication method : {authenticate_header}')
+
+    bearer = parsed_header['bearer']
+    return (bearer['realm'], bearer.get('service')), bearer.get('scope')
+
+
+def _fetch_token(config, challenge, scopes: Sequence[str]) -> RegistryToken:
+    realm, service = challenge
+    params = [('scope', scope) for scope in scopes]
+    if service:
+        params.insert(0, ('service', service))
+
+    logger.debug('Requesting a token from %s for %d scopes', realm, len(scopes))
+    headers = {'Content-Type': 'application/json'}
+    response = http_client.get(realm, params=params, headers=headers,
+                               timeout=config.timeout,
+                               host_limits=config.host_limits)
+
+    if response.status_code != 200:
+        raise WatchError(f'Authentication failed, response code {response.status_code}')
+
+    content = json.loads(response.content.decode('utf-8'))
+    token = content.get('token') or content.get('access_token')
+    registry_token = RegistryToken(token, content.get('expires_in') or DEFAULT_EXPIRES_IN)
+
+    with _LOCK:
+        for scope in scopes:
+            TOKENS[(realm, service, scope)] = registry_token
+    return registry_token
+
+
+def _is_fresh(registry_token: RegistryToken) -> bool:
+    return registry_token is not None and registry_token.is_fresh()
+
+
+def _get_scope(config) -> str:
+    return f'repository:{config.image}:pull'
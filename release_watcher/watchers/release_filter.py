@@ -0,0 +1,50 @@
+import re
+from typing import Any, Callable, Iterable, Iterator, Pattern, Sequence
+
+
+class ReleaseFilter:
+    """Filters release names with the includes and excludes of a watcher
+
+    A name is kept if it matches all the includes, and none of the excludes.
+    Patterns are matched at the start of the name (re.match).
+
+    Patterns are compiled once, when the configuration is parsed : an invalid
+    pattern raises a ValueError then, instead of failing every run."""
+
+    includes: Sequence[Pattern] = None
+    excludes: Sequence[Pattern] = None
+
+    def __init__(self, includes: Sequence[str], excludes: Sequence[str]):
+        self.includes = [_compile(pattern, 'include') for pattern in includes or []]
+        self.excludes = [_compile(pattern, 'exclude') for pattern in excludes or []]
+
+    def matches(self, name: str) -> bool:
+        """Returns True if the name passes the filter"""
+
+        return all(include.match(name) for include in self.includes) \
+            and not any(exclude.match(name) for exclude in self.excludes)
+
+    def filter(self, items: Iterable[Any], key: Callable[[Any], str] = None) -> Iterator[Any]:
+        """Lazily yields the items whose name passes the filter
+
+        By default, items are the names themselves, otherwise key returns
+        the name of an item."""
+
+        if not self.includes and not self.excludes:
+            yield from items
+            return
+
+        for item in items:
+            if self.matches(key(item) if key else item):
+                yield item
+
+    def __repr__(self):
+        return f'ReleaseFilter({[p.pattern for p in self.includes]}, ' \
+            f'{[p.pattern for p in self.excludes]})'
+
+
+def _compile(pattern: str, kind: str) -> Pattern:
+    try:
+        return re.compile(str(pattern))
+    except re.error as e:
+        raise ValueError(f'Invalid {kind} regular expression {pattern} : {e}') from e
@@ -0,0 +1,79 @@
+import logging
+import re
+from typing import Any, Iterable, Sequence, Tuple
+from packaging.version import InvalidVersion, Version
+from release_watcher.watchers.watcher_models import WatchError
+
+logger = logging.getLogger(__name__)
+
+ORDERINGS = ['date', 'semver', 'pep440']
+
+# Lenient semver : minor and patch are optional, as in most docker tags
+SEMVER_PATTERN = re.compile(
+    r'^v?(\d+)(?:\.(\d+))?(?:\.(\d+))?(?:-([0-9A-Za-z.-]+))?(?:\+[0-9A-Za-z.-]+)?$')
+
+
+def get_version_key(ordering: str, name: str) -> Any:
+    """Returns a sortable key for a release name, or None if it's not a valid version"""
+
+    if ordering == 'semver':
+        return _get_semver_key(name)
+    if ordering == 'pep440':
+        return _get_pep440_key(name)
+
+    raise ValueError(f'Unknown version ordering {ordering}')
+
+
+def select_newer_versions(ordering: str, names: Iterable[str],
+                          current: str) -> Tuple[bool, Sequence[str]]:
+    """Selects the names of the releases more recent than the current one
+
+    Returns whether the current release was found, and the newer releases,
+    most recent first. Names that are not valid versions are ignored."""
+
+    current_key = get_version_key(ordering, current)
+    if current_key is None:
+        raise WatchError(f'Current release {current} is not a valid {ordering} version')
+
+    current_found = False
+    newer_versions = []
+    for name in names:
+        if name == current:
+            current_found = True
+            continue
+
+        key = get_version_key(ordering, name)
+        if key is None:
+            logger.debug('Ignoring %s, not a valid %s version', name, ordering)
+        elif key > current_key:
+            newer_versions.append((key, name))
+
+    newer_versions.sort(key=lambda version: version[0], reverse=True)
+    return current_found, [name for _, name in newer_versions]
+
+
+def _get_semver_key(name: str) -> Tuple:
+    match = SEMVER_PATTERN.match(name)
+    if not match:
+        return None
+
+    major, minor, patch, prerelease = match.groups()
+    numbers = (int(major), int(minor or 0), int(patch or 0))
+
+    # A release without pre-release identifiers comes after all its pre-releases
+    if not prerelease:
+        return numbers + ((1, ()),)
+
+    # Numeric identifiers come before alphanumeric ones
+    identifiers = tuple(
+        (0, int(identifier), '') if identifier.isdigit() else (1, 0, identifier)
+        for identifier in prerelease.split('.')
+    )
+    return numbers + ((0, identifiers),)
+
+
+def _get_pep440_key(name: str) -> Version:
+    try:
+        return Version(name)
+    except InvalidVersion:
+        return None
@@ -1,10 +1,13 @@
 import logging
+import datetime
 from abc import ABCMeta, abstractmethod
 import time
-from typing import Dict
+from typing import Dict, Sequence, Tuple
+import requests
+from release_watcher import http_validators
 from release_watcher.base_models import WatcherConfig
 from release_watcher.config_models import CommonConfig
-from release_watcher.watchers.watcher_models import WatchResult
+from release_watcher.watchers.watcher_models import Deferred, NotModified, WatchResult
 
 logger = logging.getLogger(__name__)
 
@@ -15,22 +18,40 @@ class Watcher(metaclass=ABCMeta):
     """Base class to implement a Watcher"""
 
     config: WatcherConfig = None
+    last_result: WatchResult = None
+    last_check: datetime.datetime = None
+    pending_validators: Sequence[Tuple] = None
 
     def __init__(self, config: WatcherConfig):
         self.config = config
+        self.pending_validators = []
 
     def watch(self) -> WatchResult:
-        """Runs the watch logic to look for new releases"""
+        """Runs the watch logic to look for new releases
+
+        If the data watched didn't change since the last run, or if the
+        watcher is deferred, the last result is returned again."""
 
         logger.info(' - running %s', self)
         result = None
+        self.pending_validators = []
         try:
             start_time = time.time()
             result = self._do_watch()
+            self._commit_validators()
             end_time = time.time()
             duration_ms = (end_time - start_time) * 1000
             logger.info(' = Finished running %s in %d ms (%d missed releases found)',
-                        self, duration_ms, len(result.missed_releases))
+                        self, duration_ms, result.get_missed_release_count())
+            self.last_result = result
+            self.last_check = datetime.datetime.now(datetime.timezone.utc)
+        except NotModified:
+            logger.info(' = %s not modified since last run', self)
+            result = self.last_result
+            self.last_check = datetime.datetime.now(datetime.timezone.utc)
+        except Deferred as e:
+            logger.info(' = %s deferred to the next run : %s', self, e)
+            result = self.last_result
         except Exception as e:
             logger.exception('Error running %s : %s', self, e)
 
@@ -40,6 +61,20 @@ class Watcher(metaclass=ABCMeta):
     def _do_watch(self) -> WatchResult:
         pass
 
+    def _store_validators(self, url: str, response: requests.Response, auth: Tuple = None):
+        """Stores the validators of a response once the watch succeeds
+
+        If the watch fails after the response was received, the previous
+        result is kept : the validators must not be updated either, otherwise
+        the next runs would get a 304 and reuse the outdated result."""
+
+        self.pending_validators.append((url, response, auth))
+
+    def _commit_validators(self):
+        for url, response, auth in self.pending_validators:
+            http_validators.store_validators(url, response, auth)
+        self.pending_validators = []
+
     def __repr__(self):
         return f'{self.__class__.__name__}({self.config})'
 
@@ -64,6 +99,23 @@ class WatcherType(metaclass=ABCMeta):
     def create_watcher(self, watcher_config: WatcherConfig) -> Watcher:
         """Creates the Watcher instance from a configuation"""
 
+    def prepare_watchers(self, watchers: Sequence[Watcher]):
+        """Prepares all the watchers of this type before they are run
+
+        It's called once per run, with all the watchers of this type about
+        to be run, so that data can be fetched for all of them at once.
+        By default, nothing is done."""
+
+    def _parse_interval(self, name: str, watcher_config: Dict, default: int) -> int:
+        """Returns the polling interval of a watcher, or the default of its service"""
+
+        interval = watcher_config.get('interval', default)
+        if interval is not None and (isinstance(interval, bool) or not isinstance(interval, int)
+                                     or interval <= 0):
+            raise ValueError(f'Invalid interval {interval} for {name}, '
+                             'expected a positive number of seconds')
+        return interval
+
 
 def register_watcher_type(watcher_type: WatcherType):
     """Regiters an WatcherType to enable using it by name later"""
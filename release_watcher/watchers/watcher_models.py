@@ -10,6 +10,14 @@ class WatchError(Exception):
         self.message = message
 
 
+class NotModified(Exception):
+    """Exception raised when the data watched didn't change since the last run"""
+
+
+class Deferred(Exception):
+    """Exception raised when a watcher is postponed to a later run, to save the rate limit"""
+
+
 class Release:
     """Model for a release"""
 
@@ -31,6 +39,8 @@ class WatchResult:
     current_release: Release = None
     missed_releases: Sequence[Release] = None
     most_recent_release: Release = None
+    known_releases: Sequence[Release] = None
+    missed_release_count: int = None
 
     def __init__(self, config, current_release: Release, missed_releases: Sequence[Release]):
         self.config = config
@@ -39,3 +49,27 @@ class WatchResult:
 
         if missed_releases:
             self.most_recent_release = missed_releases[0]
+
+    def get_missed_release_count(self) -> int:
+        """Returns the number of missed releases
+
+        Watchers that count the missed releases without listing them all
+        set missed_release_count."""
+
+        if self.missed_release_count is not None:
+            return self.missed_release_count
+        return len(self.missed_releases)
+
+    def get_known_releases(self) -> Sequence[Release]:
+        """Returns all the releases seen during the watch
+
+        Watchers working incrementally set known_releases with everything they
+        listed. Otherwise, only the missed and current releases are known."""
+
+        if self.known_releases is not None:
+            return self.known_releases
+
+        releases = list(self.missed_releases)
+        if self.current_release:
+            releases.append(self.current_release)
+        return releases
@@ -31,6 +31,7 @@ setup(
         'python-dateutil==2.8.2',
         'beautifulsoup4==4.12.2',
         'prometheus-client==0.17.1',
+        'packaging==23.1',
     ],
     classifiers=[
         'License :: OSI Approved :: MIT License',